@@ -1,12 +1,26 @@
 import streamlit as st
-import subprocess
-import sqlite3
+import argparse
 import pandas as pd
 import os
+import queue
+import threading
+import time
+from src.scraper.listing import CITY_MAP, CATEGORIES
+from src.storage.database import init_db, DB_PATH
+from src.storage.queries import list_events, count_events, distinct_values, search_events
+from src.pipeline import run_streaming_pipeline
+from src.prescore import PRESCORE_THRESHOLD
+from src.metrics import metrics
+from run import iter_discovered_pages
 
 # Streamlit page configuration
 st.set_page_config(page_title="EventMind", page_icon="🎉", layout="wide")
 
+# The dashboard reads prescore, start_epoch and events_fts, so bring an existing
+# database up to the current schema before any query (a no-op once migrated)
+if os.path.exists(DB_PATH):
+    init_db()
+
 # Title and description
 st.title("EventMind: Event Scraper & Lead Generator")
 st.markdown("""
@@ -15,13 +29,7 @@ st.markdown("""
 """)
 
 # 📍 State-to-City mapping
-city_map = {
-    "CA": ["San Francisco", "Los Angeles", "San Diego"],
-    "MA": ["Boston", "Cambridge"],
-    "NY": ["New York", "Brooklyn"],
-    "WA": ["Seattle"],
-    "TX": ["Austin", "Dallas", "Houston"]
-}
+city_map = CITY_MAP
 
 # State and City selection
 st.subheader("⚙️ Configure EventMind Pipeline")
@@ -69,7 +77,7 @@ if st.button("Reset Session State"):
 with st.form("pipeline_form"):
     category = st.selectbox(
         "Category",
-        ["tech", "business", "sales"],
+        CATEGORIES,
         help="Choose the event category.",
         key="category_select"
     )
@@ -83,66 +91,185 @@ with st.form("pipeline_form"):
     )
     submitted = st.form_submit_button("🚀 Run Pipeline")
 
-# Handle pipeline execution
-if submitted:
-    with st.spinner("Running EventMind pipeline..."):
+# Same discovery as `run.py --discovery auto`: plain HTTP first, Selenium only as a fallback
+DISCOVERY_ARGS = argparse.Namespace(discovery="auto", browsers=2)
+PROGRESS_STAGES = ("discovered", "skipped", "stored", "unchanged", "below_prescore", "enriched", "failed")
+STAGE_LABELS = {
+    "discovered": "🔎 Discovered", "skipped": "⏭️ Skipped (online/unavailable)", "stored": "💾 Stored",
+    "unchanged": "♻️ Unchanged, summary kept", "below_prescore": "⏭️ Below pre-score threshold", "enriched": "✅ Enriched", "failed": "❌ Enrichment failed"
+}
+
+# Background pipeline job: discovery -> fetch -> storage -> enrichment in this process,
+# reporting per-event progress through a queue the page polls
+def start_pipeline_job(query_params, enrich_workers=4):
+    # Imported lazily: CrewAI is heavy and only needed once a run starts
+    from sum_agent import summarize_event, configure_rate_limits, build_rate_limits
+
+    init_db()
+    configure_rate_limits(build_rate_limits())
+    metrics.reset()  # the metrics panel shows this run only
+    job = {
+        "query": query_params,
+        "updates": queue.Queue(),
+        "counts": {stage: 0 for stage in PROGRESS_STAGES},
+        "rows": {},
+        "log": [],
+        "stats": None,
+        "error": None,
+        "started": time.time(),
+    }
+
+    def target():
         try:
-            progress_bar = st.progress(0)
-            status_text = st.empty()
-            if "pipeline_logs" not in st.session_state:
-                st.session_state.pipeline_logs = {"scraping": "", "summarization": ""}
-            
-            status_text.write("🔍 Scraping events from Eventbrite...")
-            run_cmd = [
-                "python", "run.py",
-                "--city", st.session_state.selected_city,
-                "--state", st.session_state.selected_state,
-                "--category", category,
-                "--max-events", str(max_events)
-            ]
-            run_result = subprocess.run(run_cmd, capture_output=True, text=True)
-            st.session_state.pipeline_logs["scraping"] = run_result.stdout
-            progress_bar.progress(50)
-            
-            status_text.write("Generating summaries and lead scores...")
-            sum_cmd = ["python", "sum_agent.py"]
-            sum_result = subprocess.run(sum_cmd, capture_output=True, text=True)
-            st.session_state.pipeline_logs["summarization"] = sum_result.stdout
-            progress_bar.progress(100)
-            status_text.write("✅ Pipeline completed!")
-            
-            st.subheader("Pipeline Output")
-            if run_result.returncode == 0 and sum_result.returncode == 0:
-                st.success("🎉 Pipeline completed successfully!")
-                with st.expander("Scraping Logs (run.py)", expanded=True):
-                    st.text_area("Scraping Logs", run_result.stdout, height=300)
-                    if run_result.stderr:
-                        st.text_area("Scraping Warnings/Errors", run_result.stderr, height=100)
-                with st.expander("Summarization Logs (sum_agent.py)", expanded=True):
-                    st.text_area("Summarization Logs", sum_result.stdout, height=300)
-                    if sum_result.stderr:
-                        st.text_area("Summarization Warnings/Errors", sum_result.stderr, height=100)
-            else:
-                st.error("⚠️ Pipeline failed.")
-                if run_result.returncode != 0:
-                    with st.expander("Scraping Error Logs"):
-                        st.text_area("Errors", run_result.stderr, height=300)
-                if sum_result.returncode != 0:
-                    with st.expander("Summarization Error Logs"):
-                        st.text_area("Errors", sum_result.stderr, height=300)
+            job["stats"] = run_streaming_pipeline(
+                query_params, lambda q: iter_discovered_pages(q, DISCOVERY_ARGS),
+                enrich=summarize_event, enrich_workers=enrich_workers, min_prescore=PRESCORE_THRESHOLD,
+                on_progress=lambda stage, event_id, data: job["updates"].put((stage, event_id, data))
+            )
         except Exception as e:
-            st.error(f"❌ Error running pipeline: {str(e)}")
+            job["error"] = str(e)
+
+    job["thread"] = threading.Thread(target=target, name="eventmind-pipeline", daemon=True)
+    job["thread"].start()
+    return job
+
+def apply_updates(job):
+    """Drain queued progress events into the job's counters and result rows."""
+    while True:
+        try:
+            stage, event_id, data = job["updates"].get_nowait()
+        except queue.Empty:
+            return
+        job["counts"][stage] += 1
+        if stage == "stored":
+            job["rows"][event_id] = {
+                "id": event_id, "name": data.get("name"), "city": data.get("city"),
+                "category_name": data.get("category_name"), "prescore": data.get("prescore"),
+                "summary": None, "lead_score": None, "status": "stored"
+            }
+        elif event_id in job["rows"]:
+            job["rows"][event_id]["status"] = stage
+            if stage == "enriched":
+                job["rows"][event_id].update(summary=data["summary"], lead_score=data["lead_score"])
+        if stage != "discovered":
+            job["log"].append(f"{STAGE_LABELS[stage]}: event {event_id}")
+
+def job_progress(job) -> float:
+    """Fraction of discovered events that reached a final state."""
+    counts = job["counts"]
+    if not counts["discovered"]:
+        return 0.0
+    # Each event takes two steps (fetch/store, then enrichment); a skipped event ends at the first, so it counts for both
+    done = (2 * counts["skipped"] + counts["stored"] + counts["unchanged"] + counts["below_prescore"]
+            + counts["enriched"] + counts["failed"])
+    return min(1.0, done / (2 * counts["discovered"]))
+
+def render_job(job):
+    """Poll the running job, updating the progress bar and this run's table until it finishes."""
+    progress_bar = st.progress(0)
+    status_text = st.empty()
+    table = st.empty()
+    while True:
+        finished = not job["thread"].is_alive()
+        apply_updates(job)
+        counts = job["counts"]
+        progress_bar.progress(1.0 if finished else job_progress(job))
+        status_text.write(
+            f"⏱️ {time.time() - job['started']:.0f}s — " +
+            ", ".join(f"{STAGE_LABELS[stage]}: {counts[stage]}" for stage in PROGRESS_STAGES)
+        )
+        if job["rows"]:
+            df = pd.DataFrame(job["rows"].values()).sort_values("lead_score", ascending=False, na_position="last")
+            table.dataframe(df)
+        if finished:
+            return
+        time.sleep(0.5)
+
+if submitted:
+    job = st.session_state.get("pipeline_job")
+    if job and job["thread"].is_alive():
+        st.warning("A pipeline run is already in progress; showing its progress below.")
+    else:
+        st.session_state.pipeline_job = start_pipeline_job({
+            "state": st.session_state.selected_state,
+            "city": st.session_state.selected_city,
+            "category": category,
+            "max_events": max_events
+        })
 
-# Display existing events on load
+# The job outlives reruns, so keep showing it (and pick up polling again) until dismissed
+job = st.session_state.get("pipeline_job")
+if job:
+    st.subheader(f"Pipeline Output: {job['query']['city']}, {job['query']['state']} / {job['query']['category']}")
+    try:
+        render_job(job)
+        if job["error"]:
+            st.error(f"❌ Error running pipeline: {job['error']}")
+        elif job["stats"].get("storage_error"):
+            st.error(f"❌ Storing events failed: {job['stats']['storage_error']}")
+        else:
+            st.success(f"🎉 Pipeline completed in {job['stats']['total_s']:.1f}s! "
+                       f"First enriched event after {job['stats']['first_enriched_s'] or '-'}s.")
+        with st.expander("Pipeline Log", expanded=False):
+            st.text_area("Pipeline Log", "\n".join(job["log"]), height=300)
+        with st.expander("Pipeline Metrics", expanded=False):
+            snapshot = metrics.snapshot()
+            if snapshot["histograms"]:
+                st.caption("Timings (seconds; p50/p95 are histogram bucket bounds)")
+                st.dataframe(pd.DataFrame(snapshot["histograms"]))
+            if snapshot["counters"]:
+                st.dataframe(pd.DataFrame(snapshot["counters"]))
+    except Exception as e:
+        st.error(f"❌ Error running pipeline: {str(e)}")
+
+# Display existing events on load, one filtered page at a time
 st.subheader("🗂 Current Events in Database")
-if os.path.exists("data/events.db"):
-    conn = sqlite3.connect("data/events.db")
-    df = pd.read_sql_query("""
-        SELECT id, name, city, category_name, summary, lead_score
-        FROM events
-        ORDER BY lead_score DESC
-    """, conn)
-    conn.close()
-    st.dataframe(df)
+if os.path.exists(DB_PATH):
+    filter_cols = st.columns(5)
+    city_filter = filter_cols[0].selectbox("City", ["All"] + distinct_values("city"), key="filter_city")
+    category_filter = filter_cols[1].selectbox("Category", ["All"] + distinct_values("category_name"),
+                                               key="filter_category")
+    start_from = filter_cols[2].date_input("Starts on or after", value=None, key="filter_start_from")
+    start_to = filter_cols[3].date_input("Starts before", value=None, key="filter_start_to")
+    min_score = filter_cols[4].slider("Minimum lead score", min_value=0, max_value=10, value=0,
+                                      help="0 includes events that are not scored yet", key="filter_min_score")
+    search_cols = st.columns([4, 1])
+    search_text = search_cols[0].text_input("🔍 Search events", placeholder="e.g. fintech summit, kubernetes",
+                                            help="Matches names, summaries, venues and categories", key="search_text")
+    page_size = search_cols[1].selectbox("Rows per page", [25, 50, 100, 250], index=1, key="page_size")
+
+    filters = {
+        "city": None if city_filter == "All" else city_filter,
+        "category": None if category_filter == "All" else category_filter,
+        "start_from": start_from.isoformat() if start_from else None,
+        "start_to": start_to.isoformat() if start_to else None,
+        "min_score": min_score or None,
+    }
+    if search_text.strip():
+        results = search_events(search_text, limit=page_size, **filters)
+        st.dataframe(pd.DataFrame(results, columns=["id", "name", "snippet", "city", "category_name", "start_utc",
+                                                    "lead_score", "url"]))
+        st.write(f"Top {len(results)} matches for “{search_text.strip()}”")
+    else:
+        # Cursors of the pages visited so far; start over whenever the filters change
+        if st.session_state.get("page_filters") != (filters, page_size):
+            st.session_state.page_filters = (filters, page_size)
+            st.session_state.page_cursors = [None]
+        cursors = st.session_state.page_cursors
+
+        rows, next_cursor = list_events(limit=page_size, after=cursors[-1], **filters)
+        total = count_events(**filters)
+        st.dataframe(pd.DataFrame(rows, columns=["id", "name", "url", "start_utc", "city", "category_name",
+                                                 "is_free", "prescore", "summary", "lead_score"]))
+
+        nav_cols = st.columns([1, 1, 4])
+        if nav_cols[0].button("⬅️ Previous", disabled=len(cursors) == 1):
+            cursors.pop()
+            st.rerun()
+        if nav_cols[1].button("Next ➡️", disabled=next_cursor is None):
+            cursors.append(next_cursor)
+            st.rerun()
+        first = (len(cursors) - 1) * page_size
+        nav_cols[2].write(f"Showing {first + 1 if rows else 0}–{first + len(rows)} of {total} events")
 else:
-    st.info("No database found. Run the pipeline to populate events.")
\ No newline at end of file
+    st.info("No database found. Run the pipeline to populate events.")
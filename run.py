@@ -1,8 +1,15 @@
 # run.py
     
-from src.scraper.selenium_scraper import get_event_ids
-from src.scraper.api_client import get_event_details, get_venue_details, get_categories
-from src.storage.database import init_db, save_event
+from src.scraper.http_discovery import get_event_ids_http, iter_event_ids_http
+from src.scraper.api_client import (
+    fetch_events, get_categories, build_event_record, set_cache_enabled, set_fetch_mode, cache_stats,
+    DEFAULT_CONCURRENCY, FETCH_MODE, FETCH_MODES
+)
+from src.storage.database import init_db, filter_new_event_ids, EventWriter
+from src.storage.journal import RunJournal
+from src.pipeline import build_queries, load_queries, run_sweep, run_streaming_pipeline
+from src.prescore import PRESCORE_THRESHOLD
+from src.metrics import metrics
 import argparse
 import logging
 
@@ -14,12 +21,106 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+def discover_event_ids(query_params, args, start_page=1, seen=None, on_page=None):
+    """Find event IDs with the configured discovery backend.
+
+    "auto" tries the plain-HTTP parser first and only starts a browser when
+    it finds nothing (e.g. the listing markup changed or we were blocked).
+    `start_page`, `seen` and `on_page` are passed to the discovery iterators.
+    """
+    if args.discovery in ("auto", "http"):
+        event_ids = get_event_ids_http(query_params, start_page=start_page, seen=seen, on_page=on_page)
+        if event_ids or args.discovery == "http":
+            return event_ids
+        logger.info("HTTP discovery found no events, falling back to Selenium")
+    # Imported lazily so HTTP-only runs never load Selenium
+    from src.scraper.selenium_scraper import get_event_ids, get_browser_pool
+    return get_event_ids(query_params, pool=get_browser_pool(args.browsers), start_page=start_page, seen=seen,
+                         on_page=on_page)
+
+def iter_discovered_pages(query_params, args, start_page=1, seen=None, on_page=None):
+    """Streaming counterpart of discover_event_ids: yields IDs page by page."""
+    found = False
+    if args.discovery in ("auto", "http"):
+        for page_ids in iter_event_ids_http(query_params, start_page=start_page, seen=seen, on_page=on_page):
+            found = True
+            yield page_ids
+        if found or args.discovery == "http":
+            return
+        logger.info("HTTP discovery found no events, falling back to Selenium")
+    from src.scraper.selenium_scraper import iter_event_ids, get_browser_pool
+    yield from iter_event_ids(query_params, pool=get_browser_pool(args.browsers), start_page=start_page, seen=seen,
+                              on_page=on_page)
+
+def iter_journaled_pages(query_params, args, journal):
+    """iter_discovered_pages that records every page in the run journal.
+
+    With --resume, IDs discovered by an earlier run but never fetched come
+    first, then discovery continues after the last recorded page (or not at
+    all if it had finished). Without it the query's old progress is dropped.
+    Discovery only counts as finished when the listing ran out before
+    max_events, so a resumed run with a higher --max-events keeps going.
+    """
+    if not getattr(args, "resume", False):
+        journal.start(query_params)
+    next_page, seen, done = journal.resume_point(query_params)
+    pending = journal.pending_ids(query_params)
+    if pending:
+        logger.info(f"⏩ Resuming {len(pending)} discovered but unfetched events")
+        yield pending
+    if done:
+        return
+    if next_page > 1:
+        logger.info(f"⏩ Resuming discovery at page {next_page} ({len(seen)} IDs already found)")
+    found = len(seen)
+    for page_ids in iter_discovered_pages(query_params, args, start_page=next_page, seen=seen,
+                                          on_page=lambda page, ids: journal.record_page(query_params, page, ids)):
+        found += len(page_ids)
+        yield page_ids
+    if found < query_params.get("max_events", 20):
+        journal.finish(query_params)
+
+def journal_progress(journal):
+    """on_progress callback recording fetch outcomes in the run journal.
+
+    Failed fetches (skipped with no data) stay pending so --resume retries them.
+    """
+    def on_progress(stage, event_id, data):
+        if stage == "stored" or (stage == "skipped" and data):
+            journal.mark([event_id], stage)
+    return on_progress
+
 def main(args):
     
     logger.info("Initializing EventMind pipeline...")
     
     # Initialize database
     init_db()
+    journal = RunJournal()
+    stale_after = args.refresh_after * 3600 if args.refresh_after is not None else None
+    if args.resume:
+        logger.info(f"Resuming from the run journal: {journal.stats()}")
+    set_fetch_mode(args.fetch_mode)
+    if args.no_cache:
+        logger.info("Venue/category cache disabled for this run")
+        set_cache_enabled(False)
+    if args.discovery == "selenium":
+        # Start the browsers now; with "auto" they are only needed if HTTP discovery finds nothing
+        from src.scraper.selenium_scraper import get_browser_pool
+        get_browser_pool(args.browsers).warm()
+
+    if args.sweep or args.queries:
+        queries = (load_queries(args.queries, args.max_events) if args.queries
+                   else build_queries(args.states, args.categories, args.max_events))
+        logger.info(f"Sweeping {len(queries)} queries...")
+        run_sweep(queries, lambda q: [eid for ids in iter_journaled_pages(q, args, journal) for eid in ids],
+                  concurrency=args.concurrency, discovery_workers=args.discovery_workers,
+                  batch_size=args.batch_size, refresh=args.refresh, on_progress=journal_progress(journal),
+                  stale_after=stale_after)
+        stats = cache_stats()
+        logger.info(f"Cache stats: venue {stats['venue']}, categories {stats['categories']}")
+        logger.info("EventMind sweep completed")
+        return
     
     # Prepare query parameters
     query_params = {
@@ -30,44 +131,73 @@ def main(args):
     }
     
     logger.info(f"Scraping events with parameters: {query_params}")
+
+    if args.stream:
+        enrich = None
+        if args.enrich:
+            # Imported lazily: CrewAI is heavy and only needed when enriching
+            from sum_agent import summarize_event, configure_rate_limits, build_rate_limits
+            configure_rate_limits(build_rate_limits())  # shared by all enrich threads
+            enrich = summarize_event
+        result = run_streaming_pipeline(query_params, lambda q: iter_journaled_pages(q, args, journal),
+                               concurrency=args.concurrency, batch_size=args.batch_size, refresh=args.refresh,
+                               enrich=enrich, enrich_workers=args.enrich_workers, min_prescore=args.min_prescore,
+                               on_progress=journal_progress(journal), stale_after=stale_after)
+        if result.get("storage_error"):
+            logger.error(f"Storage failed: {result['storage_error']}; rerun with --resume once it is fixed")
+        stats = cache_stats()
+        logger.info(f"Cache stats: venue {stats['venue']}, categories {stats['categories']}")
+        logger.info("EventMind streaming pipeline completed")
+        return
     
-    # Fetch event IDs using Selenium scraper
-    event_ids = get_event_ids(query_params)
+    # Fetch event IDs from the listing pages
+    with metrics.timer("eventmind_stage_seconds", stage="discovery"):
+        event_ids = [eid for ids in iter_journaled_pages(query_params, args, journal) for eid in ids]
     
     logger.info(f"Collected {len(event_ids)} event IDs")
 
+    # Drop events we already have before paying for any API calls
+    if args.refresh:
+        logger.info("Refresh mode: re-fetching already stored events")
+    else:
+        new_ids = filter_new_event_ids(event_ids, stale_after)
+        logger.info(f"Skipping {len(event_ids) - len(new_ids)} already stored events"
+                    + (f" checked within {args.refresh_after:g}h" if stale_after is not None else ""))
+        journal.mark(set(event_ids) - set(new_ids), "stored")
+        event_ids = new_ids
+        if not event_ids:
+            logger.info("No new events to fetch")
+            logger.info("EventMind scraping pipeline completed")
+            return
+
     # Fetch categories once
     logger.info("Fetching event categories...")
     category_map = get_categories()
     logger.info(f"Retrieved {len(category_map)} categories")
 
-    for eid in event_ids:
-        event = get_event_details(eid)
-        if not event or not event.get("id"):
-            print(f"❌ Skipped event {eid}: No data")
-            continue
-        if event.get("online_event", False) or not event.get("venue_id"):
-            print(f"ℹ️ Skipped event {eid}: Online event")
-            continue
-
-        # Fetch venue details
-        logger.info(f"Fetching venue details for venue ID: {event['venue_id']}")
-        venue = get_venue_details(event["venue_id"])
-        event_data = {
-            "id": event["id"],
-            "name": event["name"]["text"],
-            "url": event["url"],
-            "start_utc": event["start"]["utc"],
-            "city": venue.get("address", {}).get("city", ""),
-            "country": venue.get("address", {}).get("country", ""),
-            "is_free": 1 if event["is_free"] else 0,
-            "venue_name": venue.get("name", ""),
-            "category_name": category_map.get(event.get("category_id", ""), "")
-        }
-        logger.info(f"Saving event: {event_data['name']} ({event_data['city']})")
-        save_event(event_data)
-        logger.info(f"Saved event ID: {eid}")
+    logger.info(f"Fetching event and venue details with concurrency {args.concurrency}...")
+    stored_ids = []
+    with metrics.timer("eventmind_stage_seconds", stage="fetch_store"), \
+            EventWriter(batch_size=args.batch_size, overwrite=args.refresh or stale_after is not None) as writer:
+        for eid, event, venue in fetch_events(event_ids, concurrency=args.concurrency):
+            if not event or not event.get("id"):
+                print(f"❌ Skipped event {eid}: No data")
+                continue
+            if event.get("online_event", False) or not event.get("venue_id"):
+                print(f"ℹ️ Skipped event {eid}: Online event")
+                journal.mark([eid], "skipped")
+                continue
+
+            event_data = build_event_record(event, venue, category_map)
+            logger.info(f"Queued event: {event_data['name']} ({event_data['city']})")
+            writer.add_event(event_data)
+            stored_ids.append(eid)
+    # Only now are they committed; a crash before this leaves them pending for --resume
+    journal.mark(stored_ids, "stored")
+    logger.info(f"Storage stats: {writer.stats()}")
     
+    stats = cache_stats()
+    logger.info(f"Cache stats: venue {stats['venue']}, categories {stats['categories']}")
     logger.info("EventMind scraping pipeline completed")
 
 if __name__ == "__main__":
@@ -77,5 +207,37 @@ if __name__ == "__main__":
     parser.add_argument("--city", default="San Francisco", help="City (e.g., San Francisco, Boston)")
     parser.add_argument("--category", default="tech", help="Category (e.g., tech, business)")
     parser.add_argument("--max-events", type=int, default=20, help="Maximum number of events to scrape")
+    parser.add_argument("--stream", action="store_true", help="Stream IDs to fetching and storage as each results page is parsed")
+    parser.add_argument("--enrich", action="store_true", help="With --stream, summarize and score events as soon as they are stored")
+    parser.add_argument("--min-prescore", type=int, default=PRESCORE_THRESHOLD,
+                        help="With --enrich, only enrich events whose heuristic prescore is at least this")
+    parser.add_argument("--enrich-workers", type=int, default=4, help="Concurrent enrichments when streaming with --enrich")
+    parser.add_argument("--sweep", action="store_true", help="Scrape every state/city x category combination instead of one query")
+    parser.add_argument("--states", nargs="+", help="Limit --sweep to these states (e.g., CA NY)")
+    parser.add_argument("--categories", nargs="+", help="Limit --sweep to these categories (e.g., tech sales)")
+    parser.add_argument("--queries", help="JSON file with a list of {state, city, category} queries to sweep")
+    parser.add_argument("--discovery-workers", type=int, default=2, help="Queries discovered in parallel during a sweep")
+    parser.add_argument("--discovery", choices=["auto", "http", "selenium"], default="auto",
+                        help="How to find event IDs: plain HTTP, Selenium, or HTTP with Selenium fallback")
+    parser.add_argument("--browsers", type=int, default=2, help="Headless browsers kept warm to scrape result pages in parallel")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY, help="Maximum concurrent event/venue API lookups")
+    parser.add_argument("--batch-size", type=int, default=100, help="Events buffered per database transaction")
+    parser.add_argument("--fetch-mode", choices=FETCH_MODES, default=FETCH_MODE,
+                        help="separate: event, venue and category endpoints; expand: one call per event with "
+                             "venue/category inline; organizer/venue: expand plus paged event lists of recurring "
+                             "organizers/venues")
+    parser.add_argument("--refresh", action="store_true",
+                        help="Re-fetch stored events; only changed rows are rewritten, and only changes to "
+                             "name/venue/city/category/price reset the summary for re-enrichment")
+    parser.add_argument("--refresh-after", type=float,
+                        help="Like --refresh, but only for stored events last fetched more than this many hours ago")
+    parser.add_argument("--no-cache", action="store_true", help="Bypass the venue/category cache and always call the API")
+    parser.add_argument("--resume", action="store_true",
+                        help="Continue an interrupted run from the run journal: fetch IDs it found but never fetched "
+                             "and resume discovery after the last recorded page")
+    parser.add_argument("--metrics-file", help="Write run metrics in Prometheus text format to this file")
     args = parser.parse_args()
     main(args)
+    logger.info(metrics.summary())
+    if args.metrics_file:
+        metrics.write_prometheus(args.metrics_file)
@@ -1,10 +1,11 @@
 #!/bin/bash
 echo "Starting Linq Event Finder pipeline..."
-python run.py
+# Stream discovery -> fetch -> storage -> enrichment so events are summarized as they land
+python run.py --stream --enrich
 if [ $? -eq 0 ]; then
-    echo "run.py completed successfully. Starting sum_agent.py..."
+    echo "run.py completed successfully. Summarizing any remaining backlog with sum_agent.py..."
     python sum_agent.py
 else
     echo "run.py failed. Exiting..."
     exit 1
-fi
\ No newline at end of file
+fi
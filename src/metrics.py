@@ -0,0 +1,202 @@
+# src/metrics.py
+
+import threading
+import time
+from contextlib import contextmanager
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Histogram bucket upper bounds in seconds, from a cache lookup to a slow CrewAI chain
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, value):
+        self.count += 1
+        self.sum += value
+        self.max = max(self.max, value)
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q):
+        """Upper bound of the bucket holding the q-quantile (an estimate, like Prometheus)."""
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for bound, n in zip(self.buckets, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+class MetricsRegistry:
+    """Thread-safe, in-process counters and histograms keyed by name and labels.
+
+    Cheap enough to call on every API request or commit. Values live in the
+    current process; multiprocessing workers hand theirs to the parent with
+    drain() and merge().
+    """
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.started = time.time()
+        self._counters = {}
+        self._histograms = {}
+        self._help = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(name, labels):
+        return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def describe(self, name: str, help_text: str):
+        self._help[name] = help_text
+
+    def inc(self, name: str, value: float = 1, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + value
+
+    def observe(self, name: str, seconds: float, **labels):
+        key = self._key(name, labels)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram(self.buckets)
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str, **labels):
+        """Observe the duration of the with-block (also when it raises)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def drain(self) -> dict:
+        """Return the raw (picklable) values recorded so far and clear them."""
+        with self._lock:
+            data = {
+                "counters": dict(self._counters),
+                "histograms": {key: (h.counts, h.count, h.sum, h.max) for key, h in self._histograms.items()},
+            }
+            self._counters.clear()
+            self._histograms.clear()
+        return data
+
+    def merge(self, data: dict):
+        """Add values returned by another registry's drain()."""
+        with self._lock:
+            for key, value in data["counters"].items():
+                self._counters[key] = self._counters.get(key, 0) + value
+            for key, (counts, count, total, peak) in data["histograms"].items():
+                histogram = self._histograms.get(key)
+                if histogram is None:
+                    histogram = self._histograms[key] = _Histogram(self.buckets)
+                histogram.counts = [a + b for a, b in zip(histogram.counts, counts)]
+                histogram.count += count
+                histogram.sum += total
+                histogram.max = max(histogram.max, peak)
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+            self.started = time.time()
+
+    def snapshot(self) -> dict:
+        """{"counters": [...], "histograms": [...]} as plain dicts, e.g. for JSON or a dataframe."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in sorted(self._counters.items())]
+            histograms = [{"name": name, "labels": dict(labels), "count": h.count, "sum": round(h.sum, 4),
+                           "avg": round(h.sum / h.count, 4) if h.count else None,
+                           "p50": h.quantile(0.5), "p95": h.quantile(0.95), "max": round(h.max, 4)}
+                          for (name, labels), h in sorted(self._histograms.items())]
+        return {"uptime_s": round(time.time() - self.started, 1), "counters": counters, "histograms": histograms}
+
+    def summary(self) -> str:
+        """Human-readable run summary, one metric per line."""
+        snap = self.snapshot()
+        lines = [f"📈 Run metrics ({snap['uptime_s']}s):"]
+        for c in snap["counters"]:
+            lines.append(f"   {c['name']}{_label_text(c['labels'])} = {c['value']:g}")
+        for h in snap["histograms"]:
+            lines.append(f"   {h['name']}{_label_text(h['labels'])}: n={h['count']} total={h['sum']:.2f}s "
+                         f"avg={h['avg']:.3f}s p50<={h['p50']}s p95<={h['p95']}s max={h['max']:.3f}s")
+        return "\n".join(lines)
+
+    def prometheus_text(self) -> str:
+        """Prometheus text exposition format (counters and cumulative histograms)."""
+        out = []
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted(self._histograms.items())
+        typed = set()
+        for (name, labels), value in counters:
+            if name not in typed:
+                typed.add(name)
+                if name in self._help:
+                    out.append(f"# HELP {name} {self._help[name]}")
+                out.append(f"# TYPE {name} counter")
+            out.append(f"{name}{_prom_labels(labels)} {value:g}")
+        for (name, labels), h in histograms:
+            if name not in typed:
+                typed.add(name)
+                if name in self._help:
+                    out.append(f"# HELP {name} {self._help[name]}")
+                out.append(f"# TYPE {name} histogram")
+            cumulative = 0
+            for bound, n in zip(h.buckets, h.counts):
+                cumulative += n
+                out.append(f"{name}_bucket{_prom_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+            out.append(f"{name}_bucket{_prom_labels(labels + (('le', '+Inf'),))} {h.count}")
+            out.append(f"{name}_sum{_prom_labels(labels)} {h.sum:.6f}")
+            out.append(f"{name}_count{_prom_labels(labels)} {h.count}")
+        return "\n".join(out) + "\n"
+
+    def write_prometheus(self, path: str):
+        with open(path, "w") as f:
+            f.write(self.prometheus_text())
+        logger.info(f"📝 Metrics written to {path}")
+
+def _label_text(labels: dict) -> str:
+    return "{" + ", ".join(f"{k}={v}" for k, v in labels.items()) + "}" if labels else ""
+
+def _prom_labels(labels) -> str:
+    if not labels:
+        return ""
+    escape = lambda v: str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{escape(v)}"' for k, v in labels) + "}"
+
+# Process-wide registry used by the pipeline modules
+metrics = MetricsRegistry()
+for _name, _help in {
+    "eventmind_api_requests_total": "Eventbrite API responses by endpoint and HTTP status",
+    "eventmind_api_retries_total": "Eventbrite API attempts that were retried",
+    "eventmind_api_request_seconds": "Eventbrite API request latency by endpoint",
+    "eventmind_cache_requests_total": "Cache lookups by cache and result (hit/miss)",
+    "eventmind_db_commit_seconds": "SQLite batch commit latency",
+    "eventmind_db_rows_total": "Rows written or skipped by the storage writer",
+    "eventmind_browser_start_seconds": "Time to launch one headless Chromium driver",
+    "eventmind_discovery_page_seconds": "Time to load and parse one listing page, by backend",
+    "eventmind_discovery_pages_total": "Listing pages loaded, by backend",
+    "eventmind_llm_calls_total": "LLM requests by enrichment mode",
+    "eventmind_llm_seconds": "Wall time of one enrichment LLM unit (crew chain or batch call)",
+    "eventmind_llm_tokens_total": "LLM tokens by mode and kind (prompt/completion)",
+    "eventmind_search_requests_total": "Serper searches sent (cache misses)",
+    "eventmind_search_seconds": "Serper search latency",
+    "eventmind_enrichments_total": "Enrichment results by mode and outcome",
+    "eventmind_stage_seconds": "Wall time of whole pipeline stages",
+}.items():
+    metrics.describe(_name, _help)
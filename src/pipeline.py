@@ -0,0 +1,337 @@
+# src/pipeline.py
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from src.scraper.api_client import (
+    get_categories, get_event_with_venue, build_event_record, expect_events, DEFAULT_CONCURRENCY
+)
+from src.scraper.listing import CITY_MAP, CATEGORIES
+from src.storage.database import EventWriter, filter_new_event_ids
+from src.metrics import metrics
+import json
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+def query_label(query: dict) -> str:
+    return f"{query['city']}, {query['state']} / {query['category']}"
+
+def build_queries(states=None, categories=None, max_events=20) -> list:
+    """Expand the state/city x category matrix into query dicts."""
+    queries = []
+    for state, cities in CITY_MAP.items():
+        if states and state not in states:
+            continue
+        for city in cities:
+            for category in (categories or CATEGORIES):
+                queries.append({"state": state, "city": city, "category": category, "max_events": max_events})
+    return queries
+
+def load_queries(path: str, max_events=20) -> list:
+    """Read a JSON list of {"state", "city", "category"[, "max_events"]} objects."""
+    with open(path) as f:
+        queries = json.load(f)
+    for query in queries:
+        query.setdefault("max_events", max_events)
+    return queries
+
+def run_sweep(queries, discover, concurrency=DEFAULT_CONCURRENCY, discovery_workers=2,
+              batch_size=100, refresh=False, on_progress=None, stale_after=None):
+    """Discover, fetch and store events for many queries on shared worker pools.
+
+    `discover(query)` returns event IDs for one query. Discovery runs on
+    `discovery_workers` threads; each query's IDs are de-duplicated against
+    every other query (and, unless `refresh`, against the database) and fed to
+    one fetch pool of `concurrency` threads as soon as that query finishes, so
+    fetching overlaps with discovery of the remaining queries. With
+    `stale_after` (seconds), stored events not fetched for that long are
+    fetched again and updated if they changed.
+    `on_progress(stage, event_id, data)` is called for "skipped" events as
+    they are fetched (data as in run_streaming_pipeline) and for "stored"
+    ones once the writer has committed.
+    A query whose discovery raises gets an "error" in its report row, and a
+    fetch or record build that raises counts as skipped; the sweep goes on.
+    Returns the per-query report rows.
+    """
+    sweep_start = time.time()
+    notify = on_progress or (lambda stage, event_id, data: None)
+    stored_ids = []
+    category_map = get_categories()
+    seen = set()
+    seen_lock = threading.Lock()
+    report = {query_label(q): {"discovered": 0, "new": 0, "stored": 0, "skipped": 0,
+                               "discovery_s": 0.0, "done_s": 0.0} for q in queries}
+
+    def timed_discover(query):
+        start = time.time()
+        try:
+            event_ids = discover(query)
+        except Exception as e:
+            logger.error(f"❌ Discovery failed for {query_label(query)}: {e}")
+            report[query_label(query)]["error"] = str(e)
+            event_ids = []
+        elapsed = time.time() - start
+        metrics.observe("eventmind_stage_seconds", elapsed, stage="discovery")
+        return query, event_ids, elapsed
+
+    with EventWriter(batch_size=batch_size, overwrite=refresh or stale_after is not None) as writer, \
+            ThreadPoolExecutor(max_workers=max(1, discovery_workers)) as discovery_pool, \
+            ThreadPoolExecutor(max_workers=max(1, concurrency)) as fetch_pool:
+        fetches = {}
+        for future in as_completed([discovery_pool.submit(timed_discover, q) for q in queries]):
+            query, event_ids, elapsed = future.result()
+            row = report[query_label(query)]
+            with seen_lock:
+                new_ids = [eid for eid in event_ids if eid not in seen]
+                seen.update(new_ids)
+            if not refresh:
+                new_ids = filter_new_event_ids(new_ids, stale_after)
+            row.update(discovered=len(event_ids), new=len(new_ids), discovery_s=elapsed,
+                       done_s=time.time() - sweep_start)
+            logger.info(f"🔎 {query_label(query)}: {len(event_ids)} IDs, {len(new_ids)} new ({elapsed:.1f}s)")
+            expect_events(new_ids)
+            for eid in new_ids:
+                fetches[fetch_pool.submit(get_event_with_venue, eid)] = (row, eid)
+
+        for future in as_completed(fetches):
+            row, eid = fetches[future]
+            row["done_s"] = time.time() - sweep_start
+            try:
+                event, venue = future.result()
+                if not event or not event.get("id") or event.get("online_event", False) or not event.get("venue_id"):
+                    row["skipped"] += 1
+                    notify("skipped", eid, event)
+                    continue
+                record = build_event_record(event, venue, category_map)
+            except Exception as e:
+                logger.error(f"❌ Fetch failed for {eid}: {e}")
+                row["skipped"] += 1
+                notify("skipped", eid, None)
+                continue
+            writer.add_event(record)
+            stored_ids.append(eid)
+            row["stored"] += 1
+    for eid in stored_ids:
+        notify("stored", eid, None)
+
+    total = time.time() - sweep_start
+    metrics.observe("eventmind_stage_seconds", total, stage="sweep")
+    stored = sum(row["stored"] for row in report.values())
+    logger.info("📊 Sweep report (query: discovered/new/stored/skipped, discovery time, finished at):")
+    for label, row in report.items():
+        logger.info(f"   {label}: {row['discovered']}/{row['new']}/{row['stored']}/{row['skipped']}, "
+                    f"{row['discovery_s']:.1f}s, +{row['done_s']:.1f}s"
+                    + (f", discovery failed: {row['error']}" if row.get("error") else ""))
+    logger.info(f"📊 Sweep finished: {len(queries)} queries, {len(seen)} unique IDs, {stored} events stored "
+                f"in {total:.1f}s ({stored / total if total else 0:.2f} events/s); storage {writer.stats()}")
+    return report
+
+_DONE = object()
+
+def run_streaming_pipeline(query, discover_pages, concurrency=DEFAULT_CONCURRENCY, batch_size=100,
+                           refresh=False, enrich=None, enrich_workers=2, queue_size=100, on_progress=None,
+                           min_prescore=0, stale_after=None):
+    """Stream one query through discovery -> fetch -> storage -> enrichment.
+
+    `discover_pages(query)` yields lists of event IDs as each results page is
+    parsed. Every stage runs on its own threads connected by bounded queues,
+    so a slow stage applies backpressure instead of buffering everything:
+
+      discovery -> id queue -> `concurrency` fetch threads -> store queue
+        -> single writer thread -> enrich queue -> `enrich_workers` threads
+        -> store queue (summaries)
+
+    The writer commits whenever its input goes idle or a batch fills and only
+    then hands event IDs to enrichment, so enrichers always see stored rows.
+    `enrich((event_id, url))` returns (event_id, {"summary", "lead_score"}) or
+    (event_id, None), like sum_agent.summarize_event; pass None to skip it.
+    Events whose "prescore" is below `min_prescore` are stored but not enriched.
+    `refresh` and `stale_after` work as in run_sweep; a re-fetched event that
+    kept its summary (nothing enrichment-relevant changed) is not enriched again.
+    `on_progress(stage, event_id, data)` is called from worker threads for
+    "discovered", "skipped" (online or unfetchable; data is the fetched
+    event, or None if the fetch failed), "stored", "unchanged",
+    "below_prescore", "enriched" and "failed" events; every discovered ID
+    ends as skipped or stored, and with enrichment every stored one as
+    unchanged, below_prescore, enriched or failed. A fetch that raises counts as skipped; if a write
+    fails, everything not yet committed is reported skipped (data None) and
+    the returned stats carry "storage_error".
+    Returns a dict of counters and timings.
+    """
+    start = time.time()
+    notify = on_progress or (lambda stage, event_id, data: None)
+    id_queue = queue.Queue(maxsize=queue_size)
+    store_queue = queue.Queue(maxsize=queue_size)
+    # Unbounded on purpose: enrichers feed summaries back into store_queue, so
+    # bounding both directions could deadlock. Items here are already stored.
+    enrich_queue = queue.Queue()
+    stats = {"discovered": 0, "fetched": 0, "skipped": 0, "stored": 0, "unchanged": 0, "below_prescore": 0,
+             "enriched": 0, "failed": 0, "first_stored_s": None, "first_enriched_s": None}
+    stats_lock = threading.Lock()
+    fetch_workers = max(1, concurrency)
+    fetchers_left = [fetch_workers]
+    category_map = get_categories()
+
+    def bump(key, first_key=None):
+        with stats_lock:
+            stats[key] += 1
+            if first_key and stats[first_key] is None:
+                stats[first_key] = round(time.time() - start, 2)
+
+    def discovery_stage():
+        try:
+            for page_ids in discover_pages(query):
+                new_ids = page_ids if refresh else filter_new_event_ids(page_ids, stale_after)
+                expect_events(new_ids)
+                for eid in new_ids:
+                    bump("discovered")
+                    notify("discovered", eid, None)
+                    id_queue.put(eid)
+        except Exception as e:
+            logger.error(f"❌ Discovery failed for {query_label(query)}: {e}")
+        finally:
+            for _ in range(fetch_workers):
+                id_queue.put(_DONE)
+
+    def fetch_stage():
+        while True:
+            eid = id_queue.get()
+            if eid is _DONE:
+                break
+            try:
+                event, venue = get_event_with_venue(eid)
+                if not event or not event.get("id") or event.get("online_event", False) or not event.get("venue_id"):
+                    bump("skipped")
+                    notify("skipped", eid, event)
+                    continue
+                record = build_event_record(event, venue, category_map)
+            except Exception as e:
+                # One bad payload must not take the thread (and fetch_done) with it
+                logger.error(f"❌ Fetch failed for {eid}: {e}")
+                bump("skipped")
+                notify("skipped", eid, None)
+                continue
+            bump("fetched")
+            store_queue.put(("event", record))
+
+    def fetch_worker():
+        try:
+            fetch_stage()
+        finally:
+            with stats_lock:
+                fetchers_left[0] -= 1
+                last = fetchers_left[0] == 0
+            if last:
+                store_queue.put(("fetch_done", None))
+
+    def storage_stage():
+        writer = EventWriter(batch_size=batch_size, overwrite=refresh or stale_after is not None)
+        pending = []  # events added but not yet committed
+        enrichers_left = enrich_workers if enrich else 0
+        fetching = True
+        failed = []  # set once a write fails; from then on input is drained, not stored
+
+        def guarded(work, *args):
+            if failed:
+                return
+            try:
+                work(*args)
+            except Exception as e:
+                logger.error(f"❌ Storage failed for {query_label(query)}: {e}")
+                failed.append(e)
+                with stats_lock:
+                    stats["storage_error"] = str(e)
+                # Uncommitted events count as failed fetches, so --resume fetches them again
+                for record in pending:
+                    bump("skipped")
+                    notify("skipped", record["id"], None)
+                pending.clear()
+
+        def commit():
+            writer.flush()
+            # Refreshed rows keep their summary unless an enrichment-relevant field changed
+            unsummarized = writer.unsummarized([record["id"] for record in pending]) if enrich and pending else set()
+            for record in pending:
+                bump("stored", "first_stored_s")
+                notify("stored", record["id"], record)
+                if not enrich:
+                    continue
+                if record["id"] not in unsummarized:
+                    bump("unchanged")
+                    notify("unchanged", record["id"], record)
+                elif (record.get("prescore") or 10) < min_prescore:
+                    bump("below_prescore")
+                    notify("below_prescore", record["id"], record)
+                else:
+                    enrich_queue.put((record["id"], record["url"]))
+            pending.clear()
+
+        while fetching or enrichers_left:
+            try:
+                kind, payload = store_queue.get(timeout=0.5)
+            except queue.Empty:
+                guarded(commit)
+                continue
+            if kind == "event":
+                if failed:
+                    # Keep draining so fetch threads never block on a full store_queue
+                    bump("skipped")
+                    notify("skipped", payload["id"], None)
+                    continue
+                pending.append(payload)
+                guarded(writer.add_event, payload)
+                if len(pending) >= batch_size or store_queue.empty():
+                    guarded(commit)
+            elif kind == "summary":
+                guarded(writer.add_summary, *payload)
+                if store_queue.empty():
+                    guarded(writer.flush)
+            elif kind == "fetch_done":
+                fetching = False
+                guarded(commit)
+                for _ in range(enrichers_left):
+                    enrich_queue.put(_DONE)
+            elif kind == "enrich_done":
+                enrichers_left -= 1
+        if failed:
+            writer.conn.close()  # its buffer was already reported as skipped
+        else:
+            guarded(writer.close)
+        with stats_lock:
+            stats["storage"] = writer.stats()
+
+    def enrich_stage():
+        while True:
+            item = enrich_queue.get()
+            if item is _DONE:
+                break
+            try:
+                event_id, result = enrich(item)
+            except Exception as e:
+                logger.error(f"❌ Enrichment failed for {item[0]}: {e}")
+                event_id, result = item[0], None
+            if result:
+                store_queue.put(("summary", (event_id, result["summary"], result["lead_score"])))
+                bump("enriched", "first_enriched_s")
+                notify("enriched", event_id, result)
+            else:
+                bump("failed")
+                notify("failed", event_id, None)
+        store_queue.put(("enrich_done", None))
+
+    threads = [threading.Thread(target=discovery_stage, name="discovery"),
+               threading.Thread(target=storage_stage, name="storage")]
+    threads += [threading.Thread(target=fetch_worker, name=f"fetch-{i}") for i in range(fetch_workers)]
+    if enrich:
+        threads += [threading.Thread(target=enrich_stage, name=f"enrich-{i}") for i in range(enrich_workers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    stats["total_s"] = round(time.time() - start, 2)
+    metrics.observe("eventmind_stage_seconds", time.time() - start, stage="stream")
+    logger.info(f"📊 Streaming pipeline for {query_label(query)} finished: {stats}")
+    return stats
@@ -0,0 +1,141 @@
+# src/prescore.py
+
+import argparse
+import os
+import re
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Events pre-scored below this are not sent to LLM enrichment (0 sends everything)
+PRESCORE_THRESHOLD = int(os.getenv("PRESCORE_THRESHOLD", "4"))
+
+# Eventbrite category names (as stored in category_name)
+HIGH_VALUE_CATEGORIES = {"science & technology", "business & professional", "government & politics"}
+LOW_VALUE_CATEGORIES = {
+    "community & culture", "hobbies & special interest", "family & education", "music", "food & drink",
+    "film, media & entertainment", "sports & fitness", "home & lifestyle", "religion & spirituality",
+    "seasonal & holiday", "charity & causes", "fashion & beauty", "travel & outdoor", "performing & visual arts"
+}
+HIGH_VALUE_KEYWORDS = re.compile(
+    r"\b(conference|summit|expo|forum|symposium|enterprise|saas|b2b|cto|cio|cxo|vp|executive|leaders?(hip)?|"
+    r"founders?|investors?|ai|ml|cloud|security|cyber|devops|data|analytics|fintech|revenue|sales|"
+    r"marketing|go-to-market|gtm|partners?|procurement)\b", re.IGNORECASE)
+LOW_VALUE_KEYWORDS = re.compile(
+    r"\b(meetups?|happy hour|social|mixer|party|open mic|yoga|hangout|study group|book club|kids|"
+    r"family|beginners?|trivia|game night|walk|run club|volunteer|free class)\b", re.IGNORECASE)
+HIGH_VALUE_VENUES = re.compile(r"\b(convention|conference cent(er|re)|hotel|expo|marriott|hilton|hyatt)\b", re.IGNORECASE)
+LOW_VALUE_VENUES = re.compile(r"\b(cafe|café|coffee|bar|brewery|brewing|pub|library|park|church|home)\b", re.IGNORECASE)
+TECH_HUBS = {"san francisco", "new york", "seattle", "boston", "cambridge", "austin"}
+
+def prescore(event: dict) -> int:
+    """Cheap provisional lead score (1-10) from the stored event columns.
+
+    Mirrors what the LLM rewards: paid, business/tech events with
+    conference-style names at professional venues in tech hubs score high;
+    free community meetups score low.
+    """
+    score = 5
+    score += -2 if event.get("is_free") else 1
+
+    category = (event.get("category_name") or "").strip().lower()
+    if category in HIGH_VALUE_CATEGORIES:
+        score += 2
+    elif category in LOW_VALUE_CATEGORIES:
+        score -= 1
+
+    name = event.get("name") or ""
+    score += min(2, len(set(m.group(0).lower() for m in HIGH_VALUE_KEYWORDS.finditer(name))))
+    if LOW_VALUE_KEYWORDS.search(name):
+        score -= 2
+
+    venue = event.get("venue_name") or ""
+    if HIGH_VALUE_VENUES.search(venue):
+        score += 1
+    elif LOW_VALUE_VENUES.search(venue):
+        score -= 1
+
+    if (event.get("city") or "").strip().lower() in TECH_HUBS:
+        score += 1
+    return max(1, min(10, score))
+
+def backfill_prescores(db_path: str = None) -> int:
+    """Pre-score stored events that have no prescore yet; returns the number updated."""
+    from src.storage.database import connect
+
+    conn = connect(db_path)
+    try:
+        conn.row_factory = lambda cursor, row: dict(zip([col[0] for col in cursor.description], row))
+        rows = conn.execute(
+            "SELECT id, name, city, is_free, venue_name, category_name FROM events WHERE prescore IS NULL"
+        ).fetchall()
+        with conn:
+            conn.executemany("UPDATE events SET prescore = ? WHERE id = ?", [(prescore(row), row["id"]) for row in rows])
+    finally:
+        conn.close()
+    if rows:
+        logger.info(f"🧮 Pre-scored {len(rows)} stored events")
+    return len(rows)
+
+def prescore_report(threshold: int = PRESCORE_THRESHOLD, db_path: str = None) -> dict:
+    """Compare prescores with the LLM lead_score for events that have both.
+
+    Reports the mean absolute difference, Pearson correlation, the average
+    lead_score per prescore, and what `threshold` would have cost: how many
+    events it skips and how many of those the LLM scored 7 or higher.
+    """
+    from src.storage.database import connect
+
+    backfill_prescores(db_path)
+    conn = connect(db_path)
+    try:
+        pairs = conn.execute(
+            "SELECT prescore, lead_score FROM events WHERE prescore IS NOT NULL AND lead_score IS NOT NULL"
+        ).fetchall()
+        pending = conn.execute(
+            "SELECT COUNT(*), SUM(prescore < ?) FROM events WHERE summary IS NULL", (threshold,)
+        ).fetchone()
+    finally:
+        conn.close()
+
+    report = {"threshold": threshold, "compared": len(pairs),
+              "pending": pending[0], "pending_below_threshold": pending[1] or 0}
+    if not pairs:
+        return report
+    n = len(pairs)
+    pre = [p for p, _ in pairs]
+    llm = [s for _, s in pairs]
+    mean_pre, mean_llm = sum(pre) / n, sum(llm) / n
+    cov = sum((p - mean_pre) * (s - mean_llm) for p, s in pairs)
+    var_pre = sum((p - mean_pre) ** 2 for p in pre)
+    var_llm = sum((s - mean_llm) ** 2 for s in llm)
+    by_prescore = {}
+    for p, s in pairs:
+        by_prescore.setdefault(p, []).append(s)
+
+    skipped = [s for p, s in pairs if p < threshold]
+    report.update(
+        mean_abs_diff=round(sum(abs(p - s) for p, s in pairs) / n, 2),
+        correlation=round(cov / (var_pre * var_llm) ** 0.5, 3) if var_pre and var_llm else None,
+        lead_score_by_prescore={p: round(sum(v) / len(v), 1) for p, v in sorted(by_prescore.items())},
+        would_skip=len(skipped),
+        would_skip_high_value=sum(1 for s in skipped if s >= 7),
+        skipped_mean_lead_score=round(sum(skipped) / len(skipped), 1) if skipped else None,
+    )
+    return report
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
+    parser = argparse.ArgumentParser(description="EventMind: Compare heuristic pre-scores with LLM lead scores")
+    parser.add_argument("--threshold", type=int, default=PRESCORE_THRESHOLD, help="Minimum prescore sent to enrichment")
+    args = parser.parse_args()
+
+    report = prescore_report(args.threshold)
+    print(f"📊 Pre-score report (threshold {report['threshold']}): {report['compared']} events with both scores")
+    if report["compared"]:
+        print(f"   Mean |prescore - lead_score|: {report['mean_abs_diff']}, correlation: {report['correlation']}")
+        for p, avg in report["lead_score_by_prescore"].items():
+            print(f"   prescore {p:>2}: avg lead_score {avg}")
+        print(f"   Below threshold: {report['would_skip']} events, avg lead_score {report['skipped_mean_lead_score']}, "
+              f"{report['would_skip_high_value']} scored 7+ by the LLM")
+    print(f"   Pending enrichment: {report['pending']} events, {report['pending_below_threshold']} below threshold")
@@ -1,44 +1,309 @@
 # src/scraper/api_client.py
 import requests
 import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from email.utils import parsedate_to_datetime
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
+from src.metrics import metrics
+from src.prescore import prescore
+from src.ratelimit import TokenBucket
+from src.storage.cache import TTLCache
 
 load_dotenv()
 
 TOKEN = os.getenv("EVENTBRITE_TOKEN")
+API_BASE = os.getenv("EVENTBRITE_API_BASE", "https://www.eventbriteapi.com/v3")
+DEFAULT_CONCURRENCY = 8
+# Eventbrite allows 2,000 calls per hour per token; bank a full hour so short
+# runs can burst while long sweeps settle at the quota rate.
+QUOTA_PER_HOUR = int(os.getenv("EVENTBRITE_QUOTA_PER_HOUR", "2000"))
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+VENUE_CACHE_TTL = float(os.getenv("VENUE_CACHE_TTL", str(7 * 24 * 3600)))
+CATEGORY_CACHE_TTL = float(os.getenv("CATEGORY_CACHE_TTL", str(30 * 24 * 3600)))
+CACHE_ENABLED = os.getenv("EVENTMIND_CACHE", "1") != "0"
+# separate: event, venue and category endpoints (2 calls per event plus cached venues/categories)
+# expand: one events/<id>/?expand=venue,category call per event
+# organizer: like expand, but once an organizer has shown up ORGANIZER_LIST_AFTER
+#   times its live events are listed in pages of 50 and served from memory
+# venue: the same, listing the events of venues that show up VENUE_LIST_AFTER times
+FETCH_MODES = ("separate", "expand", "organizer", "venue")
+FETCH_MODE = os.getenv("EVENTBRITE_FETCH_MODE", "expand")
+EXPANSIONS = "venue,category"
+ORGANIZER_LIST_AFTER = int(os.getenv("EVENTBRITE_ORGANIZER_LIST_AFTER", "2"))
+ORGANIZER_MAX_PAGES = int(os.getenv("EVENTBRITE_ORGANIZER_MAX_PAGES", "4"))
+VENUE_LIST_AFTER = int(os.getenv("EVENTBRITE_VENUE_LIST_AFTER", "2"))
+VENUE_MAX_PAGES = int(os.getenv("EVENTBRITE_VENUE_MAX_PAGES", "4"))
 
-def get_event_details(event_id: str) -> dict:
-    url = f"https://www.eventbriteapi.com/v3/events/{event_id}/"
-    headers = {"Authorization": f"Bearer {TOKEN}"}
+class EventbriteClient:
+    """Shared Eventbrite API client with pooled keep-alive connections and retries."""
+
+    def __init__(self, token=None, pool_size=32, max_retries=4, backoff=0.5,
+                 max_backoff=30.0, timeout=5, limiter=None):
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.limiter = limiter
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["Authorization"] = f"Bearer {token or TOKEN}"
+
+    def get(self, path: str, params: dict = None) -> dict:
+        """GET `path` relative to API_BASE, retrying 429/5xx and connection errors."""
+        url = f"{API_BASE}/{path.lstrip('/')}"
+        endpoint = path.strip("/").split("/", 1)[0]  # "events", "venues", "categories"
+        for attempt in range(self.max_retries + 1):
+            if self.limiter:
+                self.limiter.acquire()
+            try:
+                with metrics.timer("eventmind_api_request_seconds", endpoint=endpoint):
+                    response = self.session.get(url, params=params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                metrics.inc("eventmind_api_requests_total", endpoint=endpoint, status="error")
+                if attempt == self.max_retries:
+                    raise
+                metrics.inc("eventmind_api_retries_total", endpoint=endpoint)
+                time.sleep(self._backoff_delay(attempt))
+                continue
+            metrics.inc("eventmind_api_requests_total", endpoint=endpoint, status=response.status_code)
+            if response.status_code in RETRY_STATUSES and attempt < self.max_retries:
+                metrics.inc("eventmind_api_retries_total", endpoint=endpoint)
+                delay = _retry_after(response)
+                time.sleep(delay if delay is not None else self._backoff_delay(attempt))
+                continue
+            response.raise_for_status()
+            return response.json()
+
+    def _backoff_delay(self, attempt: int) -> float:
+        # Exponential backoff with full jitter
+        return random.uniform(0, min(self.max_backoff, self.backoff * 2 ** attempt))
+
+def _retry_after(response):
+    """Seconds to wait according to a Retry-After header, or None."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-        return response.json()
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+_rate_limiter = TokenBucket(rate=QUOTA_PER_HOUR / 3600, capacity=QUOTA_PER_HOUR)
+venue_cache = TTLCache("venue", ttl=VENUE_CACHE_TTL, enabled=CACHE_ENABLED)
+category_cache = TTLCache("categories", ttl=CATEGORY_CACHE_TTL, max_entries=4, enabled=CACHE_ENABLED)
+_client = None
+_client_lock = threading.Lock()
+
+def get_client() -> EventbriteClient:
+    """Return the process-wide client, creating it on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = EventbriteClient(limiter=_rate_limiter)
+        return _client
+
+def set_fetch_mode(mode: str):
+    """Choose how get_event_with_venue calls the API (see FETCH_MODES)."""
+    global FETCH_MODE
+    if mode not in FETCH_MODES:
+        raise ValueError(f"unknown fetch mode: {mode}")
+    FETCH_MODE = mode
+
+def set_cache_enabled(enabled: bool):
+    """Turn the venue and category caches on or off for this process."""
+    venue_cache.enabled = enabled
+    category_cache.enabled = enabled
+
+def cache_stats() -> dict:
+    return {"venue": venue_cache.stats(), "categories": category_cache.stats()}
+
+def get_event_details(event_id: str, expand: str = None) -> dict:
+    try:
+        return get_client().get(f"events/{event_id}/", params={"expand": expand} if expand else None)
     except requests.RequestException as e:
         print(f"❌ Failed for event {event_id}: {e}")
         return {}
 
+def iter_paged(path: str, key: str, params: dict = None, max_pages: int = None, stop_when=None):
+    """Yield the items under `key` from a paginated list endpoint, following continuation tokens.
+
+    Paging stops early once `stop_when(page_items)` returns true.
+    """
+    params = dict(params or {})
+    for _ in range(max_pages or 10 ** 6):
+        data = get_client().get(path, params=params)
+        items = data.get(key, [])
+        yield from items
+        if stop_when and stop_when(items):
+            return
+        pagination = data.get("pagination") or {}
+        if not pagination.get("has_more_items") or not pagination.get("continuation"):
+            return
+        params["continuation"] = pagination["continuation"]
+
+def get_organizer_events(organizer_id: str, max_pages: int = None, status: str = "live", stop_when=None) -> list:
+    """An organizer's events with venue and category expanded, 50 per call (see iter_paged for `stop_when`)."""
+    try:
+        return list(iter_paged(f"organizers/{organizer_id}/events/", "events",
+                               {"status": status, "expand": EXPANSIONS}, max_pages, stop_when))
+    except requests.RequestException as e:
+        print(f"❌ Failed to list events of organizer {organizer_id}: {e}")
+        return []
+
+def get_venue_events(venue_id: str, max_pages: int = None, status: str = "live", stop_when=None) -> list:
+    """A venue's events with venue and category expanded, 50 per call (see iter_paged for `stop_when`)."""
+    try:
+        return list(iter_paged(f"venues/{venue_id}/events/", "events",
+                               {"status": status, "expand": EXPANSIONS}, max_pages, stop_when))
+    except requests.RequestException as e:
+        print(f"❌ Failed to list events of venue {venue_id}: {e}")
+        return []
+
+class _ListPrefetcher:
+    """Lists the events of organizers (or venues) that keep showing up, so their other events need no call.
+
+    `field` is the event key to group by ("organizer_id" or "venue_id") and
+    `lister(id, max_pages, stop_when=...)` returns that group's events. Only
+    IDs announced with want() and not fetched yet are worth listing: nothing
+    is listed while none are outstanding, paging stops at the first page
+    without any of them, and only those events are held in memory until
+    requested (or the process ends). A busy venue thus costs one page, not
+    max_pages.
+    """
+
+    def __init__(self, field: str, lister, list_after: int, max_pages: int):
+        self.field = field
+        self.lister = lister
+        self.list_after = list_after
+        self.max_pages = max_pages
+        self._events = {}
+        self._wanted = set()
+        self._sightings = {}
+        self._listed = set()
+        self._lock = threading.Lock()
+
+    def want(self, event_ids):
+        """Announce IDs that are about to be fetched."""
+        with self._lock:
+            self._wanted.update(str(eid) for eid in event_ids)
+
+    def take(self, event_id: str) -> dict:
+        with self._lock:
+            self._wanted.discard(str(event_id))
+            event = self._events.pop(str(event_id), None)
+        if event is not None:
+            metrics.inc("eventmind_cache_requests_total", cache=self.field.replace("_id", "_events"), result="hit")
+        return event
+
+    def saw(self, event: dict):
+        group_id = event.get(self.field)
+        if not group_id:
+            return
+        with self._lock:
+            self._sightings[group_id] = self._sightings.get(group_id, 0) + 1
+            if group_id in self._listed or self._sightings[group_id] < self.list_after or not self._wanted:
+                return
+            self._listed.add(group_id)
+        listed = self.lister(group_id, self.max_pages, stop_when=self._nothing_wanted)
+        with self._lock:
+            for item in listed:
+                if str(item.get("id")) in self._wanted:
+                    self._events.setdefault(str(item["id"]), item)
+
+    def _nothing_wanted(self, page):
+        with self._lock:
+            return not any(str(item.get("id")) in self._wanted for item in page)
+
+def new_prefetchers() -> dict:
+    """Empty prefetchers for the listing fetch modes, keyed by mode."""
+    return {
+        "organizer": _ListPrefetcher("organizer_id", get_organizer_events, ORGANIZER_LIST_AFTER, ORGANIZER_MAX_PAGES),
+        "venue": _ListPrefetcher("venue_id", get_venue_events, VENUE_LIST_AFTER, VENUE_MAX_PAGES),
+    }
+
+_prefetchers = new_prefetchers()
+
+def expect_events(event_ids):
+    """Tell the current fetch mode which IDs are about to be fetched (used by the organizer/venue modes)."""
+    prefetcher = _prefetchers.get(FETCH_MODE)
+    if prefetcher:
+        prefetcher.want(event_ids)
+
 def get_venue_details(venue_id: str) -> dict:
     if not venue_id:
         return {}
-    url = f"https://www.eventbriteapi.com/v3/venues/{venue_id}/"
-    headers = {"Authorization": f"Bearer {TOKEN}"}
+    return venue_cache.get_or_load(venue_id, lambda: _fetch_venue(venue_id))
+
+def _fetch_venue(venue_id: str) -> dict:
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-        return response.json()
+        return get_client().get(f"venues/{venue_id}/")
     except requests.RequestException as e:
         print(f"❌ Failed for venue {venue_id}: {e}")
         return {}
 
 def get_categories() -> dict:
-    url = "https://www.eventbriteapi.com/v3/categories/"
-    headers = {"Authorization": f"Bearer {TOKEN}"}
+    return category_cache.get_or_load("all", _fetch_categories)
+
+def _fetch_categories() -> dict:
     try:
-        response = requests.get(url, headers=headers, timeout=5)
-        response.raise_for_status()
-        categories = response.json().get("categories", [])
+        categories = get_client().get("categories/").get("categories", [])
         return {cat["id"]: cat["name"] for cat in categories}
     except requests.RequestException as e:
         print(f"❌ Failed to fetch categories: {e}")
-        return {}
\ No newline at end of file
+        return {}
+
+def build_event_record(event, venue, category_map):
+    """Flatten Eventbrite event and venue payloads into an events table row."""
+    record = {
+        "id": event["id"],
+        "name": event["name"]["text"],
+        "url": event["url"],
+        "start_utc": event["start"]["utc"],
+        "city": venue.get("address", {}).get("city", ""),
+        "country": venue.get("address", {}).get("country", ""),
+        "is_free": 1 if event["is_free"] else 0,
+        "venue_name": venue.get("name", ""),
+        "category_name": (event.get("category") or {}).get("name") or category_map.get(event.get("category_id", ""), ""),
+        "changed": event.get("changed")  # Eventbrite's last-modified time, kept as source_changed
+    }
+    record["prescore"] = prescore(record)
+    return record
+
+def get_event_with_venue(event_id: str) -> tuple:
+    """Fetch an event and, for in-person events, its venue, the way FETCH_MODE says."""
+    prefetcher = _prefetchers.get(FETCH_MODE)
+    if FETCH_MODE == "separate":
+        event = get_event_details(event_id)
+    else:
+        event = (prefetcher.take(event_id) if prefetcher else None) or get_event_details(event_id, expand=EXPANSIONS)
+    if not event or not event.get("id"):
+        return event, {}
+    if prefetcher:
+        prefetcher.saw(event)
+    if event.get("online_event", False) or not event.get("venue_id"):
+        return event, {}
+    return event, event.get("venue") or get_venue_details(event["venue_id"])
+
+def fetch_events(event_ids, concurrency: int = DEFAULT_CONCURRENCY):
+    """Pipeline event -> venue lookups for many IDs with at most `concurrency` in flight.
+
+    Yields (event_id, event, venue) tuples in completion order.
+    """
+    workers = max(1, concurrency)
+    event_ids = list(event_ids)
+    expect_events(event_ids)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        futures = {executor.submit(get_event_with_venue, eid): eid for eid in event_ids}
+        for future in as_completed(futures):
+            event, venue = future.result()
+            yield futures[future], event, venue
@@ -0,0 +1,114 @@
+# src/scraper/http_discovery.py
+
+from html.parser import HTMLParser
+from src.metrics import metrics
+from src.scraper.listing import listing_url, extract_event_id
+import re
+import requests
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Event links inside embedded JSON/script blobs, e.g. "url":"https://www.eventbrite.com/e/foo-123"
+EMBEDDED_EVENT_RE = re.compile(r'/e/[\w%-]+-(\d+)')
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 (KHTML, like Gecko) "
+                  "Chrome/124.0 Safari/537.36",
+    "Accept": "text/html,application/xhtml+xml",
+    "Accept-Language": "en-US,en;q=0.9",
+}
+
+class EventLinkParser(HTMLParser):
+    """Incremental parser collecting event IDs from <a href> links and inline <script> data.
+
+    Feed it chunks as they arrive; `event_ids` keeps first-seen order.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self._ids = {}
+        self._in_script = False
+
+    @property
+    def event_ids(self) -> list:
+        return list(self._ids)
+
+    def handle_starttag(self, tag, attrs):
+        if tag == "a":
+            eid = extract_event_id(dict(attrs).get("href"))
+            if eid:
+                self._ids.setdefault(eid, None)
+        elif tag == "script":
+            self._in_script = True
+
+    def handle_endtag(self, tag):
+        if tag == "script":
+            self._in_script = False
+
+    def handle_data(self, data):
+        # Script bodies can be split across chunks; an ID cut in half shows up
+        # again in the anchors or later in the same JSON blob.
+        if self._in_script:
+            for eid in EMBEDDED_EVENT_RE.findall(data.replace("\\/", "/")):
+                self._ids.setdefault(eid, None)
+
+def extract_event_ids(chunks) -> list:
+    """Parse an HTML string or an iterable of text chunks and return event IDs."""
+    parser = EventLinkParser()
+    for chunk in ([chunks] if isinstance(chunks, str) else chunks):
+        parser.feed(chunk)
+    parser.close()
+    return parser.event_ids
+
+def fetch_page_ids(session: requests.Session, url: str) -> list:
+    """Stream one results page through the parser; returns [] on HTTP errors."""
+    metrics.inc("eventmind_discovery_pages_total", backend="http")
+    try:
+        with metrics.timer("eventmind_discovery_page_seconds", backend="http"), \
+                session.get(url, headers=HEADERS, timeout=10, stream=True) as response:
+            response.raise_for_status()
+            response.encoding = response.encoding or "utf-8"
+            return extract_event_ids(response.iter_content(chunk_size=16384, decode_unicode=True))
+    except requests.RequestException as e:
+        logger.warning(f"⚠️ HTTP discovery failed for {url}: {e}")
+        return []
+
+def iter_event_ids_http(query_params, session: requests.Session = None, start_page: int = 1, seen=None,
+                        on_page=None):
+    """Yield lists of new event IDs page by page using plain HTTP requests.
+
+    Stops when a page adds nothing new or once max_events IDs have been yielded.
+    A resumed run passes the page to continue from and the IDs it already
+    has in `seen` (they count towards max_events). `on_page(page, new_ids)`
+    is called for each page before its IDs are yielded; a page cut short by
+    max_events is reported as page - 1, so a resumed run loads it again.
+    """
+    max_events = query_params.get("max_events", 20)
+    session = session or requests.Session()
+    seen = set(seen or ())
+    page = start_page
+
+    logger.info(f"🔍 Fetching Eventbrite listings in {query_params.get('city')}, "
+                f"{query_params.get('state')} for {query_params.get('category')} over HTTP...")
+
+    while len(seen) < max_events:
+        url = listing_url(query_params, page)
+        logger.info(f"🌐 Fetching page {page}: {url}")
+        new_ids = [eid for eid in fetch_page_ids(session, url) if eid not in seen]
+        if not new_ids:
+            return
+        cut_short = len(new_ids) > max_events - len(seen)
+        new_ids = new_ids[:max_events - len(seen)]
+        seen.update(new_ids)
+        if on_page:
+            on_page(page - 1 if cut_short else page, new_ids)
+        yield new_ids
+        page += 1
+
+def get_event_ids_http(query_params, session: requests.Session = None, start_page: int = 1, seen=None,
+                       on_page=None) -> list:
+    """Collect up to max_events event IDs with plain HTTP requests, no browser."""
+    event_ids = [eid for page_ids in iter_event_ids_http(query_params, session, start_page, seen, on_page)
+                 for eid in page_ids]
+    logger.info(f"✅ Collected {len(event_ids)} event IDs over HTTP.")
+    return event_ids
@@ -0,0 +1,30 @@
+# src/scraper/listing.py
+
+import os
+import re
+
+# Overridable so benchmarks can point discovery at a local stand-in
+EVENTBRITE_WEB_BASE = os.getenv("EVENTBRITE_WEB_BASE", "https://www.eventbrite.com")
+EVENT_HREF_RE = re.compile(r'/e/.+-([0-9]+)')
+
+# State-to-city matrix covered by the app and by sweep runs
+CITY_MAP = {
+    "CA": ["San Francisco", "Los Angeles", "San Diego"],
+    "MA": ["Boston", "Cambridge"],
+    "NY": ["New York", "Brooklyn"],
+    "WA": ["Seattle"],
+    "TX": ["Austin", "Dallas", "Houston"]
+}
+CATEGORIES = ["tech", "business", "sales"]
+
+def listing_url(query_params: dict, page: int) -> str:
+    """Eventbrite search results URL for a (state, city, category) query."""
+    state = query_params.get("state").lower()
+    city = query_params.get("city").lower().replace(" ", "-")
+    category = query_params.get("category").lower()
+    return f"{EVENTBRITE_WEB_BASE}/d/{state}--{city}/{category}--events/?page={page}"
+
+def extract_event_id(href: str):
+    """Return the numeric event ID from an /e/<slug>-<id> link, or None."""
+    match = EVENT_HREF_RE.search(href or "")
+    return match.group(1) if match else None
@@ -1,60 +1,199 @@
 # src/scraper/selenium_scraper.py
-    
+
 from selenium import webdriver
+from selenium.common.exceptions import TimeoutException, WebDriverException
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.chrome.service import Service
-import re
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from src.metrics import metrics
+from src.scraper.listing import listing_url, extract_event_id
+import atexit
+import os
+import queue
+import threading
 import time
 import logging
 
 logging.basicConfig(level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s")
 logger = logging.getLogger(__name__)
 
-def get_event_ids(query_params):
-    
-    state = query_params.get("state").lower()
-    city = query_params.get("city").lower().replace(" ", "-")
-    category = query_params.get("category").lower()
-    max_events = query_params.get("max_events", 20)
-    
-    
+CHROME_BIN = os.getenv("CHROME_BIN", "/usr/bin/chromium")
+CHROMEDRIVER_PATH = os.getenv("CHROMEDRIVER_PATH", "/usr/bin/chromedriver")
+DEFAULT_POOL_SIZE = int(os.getenv("BROWSER_POOL_SIZE", "2"))
+CHECKOUT_TIMEOUT = float(os.getenv("BROWSER_CHECKOUT_TIMEOUT", "120"))  # seconds to wait for a free driver
+PAGE_WAIT_TIMEOUT = 10  # seconds to wait for event links before treating a page as empty
+EVENT_LINK_XPATH = "//a[contains(@href, '/e/')]"
+
+def create_driver():
     chrome_options = Options()
     chrome_options.add_argument("--headless")
     chrome_options.add_argument("--no-sandbox")
     chrome_options.add_argument("--disable-dev-shm-usage")
-    chrome_options.binary_location = "/usr/bin/chromium"
-    service = Service("/usr/bin/chromedriver")
-    driver = webdriver.Chrome(service=service, options=chrome_options)
+    chrome_options.binary_location = CHROME_BIN
+    service = Service(CHROMEDRIVER_PATH)
+    with metrics.timer("eventmind_browser_start_seconds"):
+        return webdriver.Chrome(service=service, options=chrome_options)
+
+class BrowserPool:
+    """Keeps up to `size` headless Chromium drivers alive for reuse across queries."""
+
+    def __init__(self, size: int = DEFAULT_POOL_SIZE):
+        self.size = max(1, size)
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def warm(self, count: int = None):
+        """Start drivers ahead of time, in parallel, so the first query doesn't pay for startup."""
+        with self._lock:
+            missing = max(0, min(count or self.size, self.size) - self._created)
+            self._created += missing
+
+        def start():
+            try:
+                self._idle.put(create_driver())
+            except Exception as e:
+                with self._lock:
+                    self._created -= 1
+                logger.warning(f"⚠️ Could not pre-start a browser: {e}")
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=missing) as executor:
+                for _ in range(missing):
+                    executor.submit(start)
 
-    event_ids = set()
-    page = 1
+    @contextmanager
+    def driver(self):
+        """Check out a driver; any failure while it is in use discards it instead of returning it.
 
-    #print(f"🔍 Scraping Eventbrite events in {city}...")
-    logger.info(f"🔍 Scraping Eventbrite events in {city}, {state} for {category}...")
+        That includes urllib3 errors from a crashed or hung chromedriver and
+        KeyboardInterrupt, so a pool slot is never leaked.
+        """
+        driver = self._checkout()
+        try:
+            yield driver
+        except BaseException:
+            self._discard(driver)
+            raise
+        else:
+            self._idle.put(driver)
 
-    while len(event_ids) < max_events:
-        url = f"https://www.eventbrite.com/d/{state}--{city}/{category}--events/?page={page}"
-        #print(f"🌐 Visiting page {page}: {url}")
-        logger.info(f"🌐 Visiting page {page}: {url}")
+    def _checkout(self):
+        deadline = time.monotonic() + CHECKOUT_TIMEOUT
+        while True:
+            try:
+                return self._idle.get_nowait()
+            except queue.Empty:
+                pass
+            with self._lock:
+                can_create = self._created < self.size
+                if can_create:
+                    self._created += 1
+            if can_create:
+                try:
+                    return create_driver()
+                except Exception:
+                    with self._lock:
+                        self._created -= 1
+                    raise
+            # Wake up now and then: a discarded driver frees a slot without returning anything to _idle
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise TimeoutException(f"no browser became free within {CHECKOUT_TIMEOUT:.0f}s")
+            try:
+                return self._idle.get(timeout=min(1.0, remaining))
+            except queue.Empty:
+                pass
+
+    def _discard(self, driver):
+        with self._lock:
+            self._created -= 1
+        try:
+            driver.quit()
+        except Exception:
+            pass  # already dead
+
+    def close(self):
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+            self._discard(driver)
+
+_pool = None
+_pool_lock = threading.Lock()
+
+def get_browser_pool(size: int = DEFAULT_POOL_SIZE) -> BrowserPool:
+    """Return the process-wide browser pool, creating it on first use."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = BrowserPool(size)
+            atexit.register(_pool.close)
+        return _pool
+
+def scrape_page(pool: BrowserPool, url: str) -> list:
+    """Load one results page and return the event IDs linked from it, in page order."""
+    logger.info(f"🌐 Visiting {url}")
+    metrics.inc("eventmind_discovery_pages_total", backend="selenium")
+    with pool.driver() as driver, metrics.timer("eventmind_discovery_page_seconds", backend="selenium"):
         driver.get(url)
-        time.sleep(3)  # wait for events to load
+        try:
+            WebDriverWait(driver, PAGE_WAIT_TIMEOUT).until(
+                EC.presence_of_element_located((By.XPATH, EVENT_LINK_XPATH))
+            )
+        except TimeoutException:
+            return []
+        links = driver.find_elements(By.XPATH, EVENT_LINK_XPATH)
+        hrefs = [link.get_attribute("href") for link in links]
+    return [eid for eid in map(extract_event_id, hrefs) if eid]
+
+def iter_event_ids(query_params, pool: BrowserPool = None, start_page: int = 1, seen=None, on_page=None):
+    """Yield lists of new event IDs page by page, scraping `pool.size` pages at a time.
 
-        links = driver.find_elements("xpath", "//a[contains(@href, '/e/')]")
-        if not links:
-            print("🚫 No more events found.")
-            break
+    Stops at the first empty page, when a batch of pages adds nothing new, or once max_events IDs have been yielded.
+    `start_page`, `seen` and `on_page(page, new_ids)` work as in iter_event_ids_http.
+    """
+    max_events = query_params.get("max_events", 20)
+    pool = pool or get_browser_pool()
+    seen = set(seen or ())
+    page = start_page
 
-        for link in links:
-            href = link.get_attribute("href")
-            match = re.search(r'/e/.+-([0-9]+)', href)
-            if match:
-                event_ids.add(match.group(1))
-                if len(event_ids) >= max_events:
-                    break
+    logger.info(f"🔍 Scraping Eventbrite events in {query_params.get('city')}, "
+                f"{query_params.get('state')} for {query_params.get('category')}...")
 
-        page += 1
+    with ThreadPoolExecutor(max_workers=pool.size) as executor:
+        while len(seen) < max_events:
+            pages = range(page, page + pool.size)
+            results = executor.map(lambda p: scrape_page(pool, listing_url(query_params, p)), pages)
+            added = 0
+            for offset, page_ids in enumerate(results):
+                if not page_ids:
+                    print("🚫 No more events found.")
+                    return
+                new_ids = [eid for eid in dict.fromkeys(page_ids) if eid not in seen]
+                cut_short = len(new_ids) > max_events - len(seen)
+                new_ids = new_ids[:max_events - len(seen)]
+                seen.update(new_ids)
+                added += len(new_ids)
+                if on_page:
+                    on_page(page + offset - 1 if cut_short else page + offset, new_ids)
+                if new_ids:
+                    yield new_ids
+                if len(seen) >= max_events:
+                    return
+            if not added:
+                return  # Pages past the end repeat earlier results
+            page += pool.size
 
-    driver.quit()
+def get_event_ids(query_params, pool: BrowserPool = None, start_page: int = 1, seen=None, on_page=None):
+    """Collect up to max_events event IDs with headless Chromium."""
+    event_ids = [eid for page_ids in iter_event_ids(query_params, pool, start_page, seen, on_page)
+                 for eid in page_ids]
     print(f"✅ Collected {len(event_ids)} event IDs.")
-    return list(event_ids)
-
+    return event_ids
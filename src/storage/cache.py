@@ -0,0 +1,135 @@
+# src/storage/cache.py
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from src.metrics import metrics
+from src.storage.database import DB_PATH, connect, migrate
+
+_MISSING = object()
+
+class TTLCache:
+    """In-memory LRU with per-entry TTL, backed by the api_cache table in SQLite.
+
+    Lookups hit memory first, then SQLite; values must be JSON-serialisable.
+    Set `enabled = False` to bypass both layers entirely.
+    """
+
+    def __init__(self, namespace: str, ttl: float, max_entries: int = 1024,
+                 db_path: str = None, enabled: bool = True):
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.db_path = db_path or DB_PATH
+        self.enabled = enabled
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._key_locks = {}
+        self._conn = None
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.db_path) or ".", exist_ok=True)
+            self._conn = connect(self.db_path)
+            migrate(self._conn)
+        return self._conn
+
+    def get(self, key, default=None):
+        if not self.enabled:
+            return default
+        with self._lock:
+            value, result = self._lookup(str(key))
+        self._count(result)
+        return default if value is _MISSING else value
+
+    def set(self, key, value):
+        if not self.enabled:
+            return
+        key = str(key)
+        expires_at = time.time() + self.ttl
+        with self._lock:
+            self._remember(key, value, expires_at)
+            conn = self._db()
+            conn.execute(
+                "INSERT OR REPLACE INTO api_cache (namespace, key, value, expires_at) VALUES (?, ?, ?, ?)",
+                (self.namespace, key, json.dumps(value), expires_at)
+            )
+            conn.commit()
+
+    def get_or_load(self, key, loader):
+        """Return the cached value for `key`, calling `loader()` once on a miss.
+
+        Concurrent callers for the same key wait for the first load instead of
+        repeating it. Falsy results (failed lookups) are not cached.
+        """
+        if not self.enabled:
+            return loader()
+        key = str(key)
+        with self._lock:
+            value, result = self._lookup(key)
+            if value is _MISSING:
+                key_lock = self._key_locks.setdefault(key, threading.Lock())
+        if value is not _MISSING:
+            self._count(result)
+            return value
+        with key_lock:
+            # Another caller may have loaded it while we waited; only count once we know which it was
+            with self._lock:
+                value, result = self._lookup(key)
+            self._count(result)
+            if value is _MISSING:
+                value = loader()
+                if value:
+                    self.set(key, value)
+        with self._lock:
+            self._key_locks.pop(key, None)
+        return value
+
+    def purge_expired(self):
+        """Drop expired rows for this namespace from SQLite."""
+        with self._lock:
+            conn = self._db()
+            conn.execute("DELETE FROM api_cache WHERE namespace = ? AND expires_at <= ?", (self.namespace, time.time()))
+            conn.commit()
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "disk_hits": self.disk_hits, "misses": self.misses}
+
+    def _lookup(self, key):
+        """(value or _MISSING, "hit" | "disk_hit" | "miss"); caller holds self._lock and counts the result."""
+        now = time.time()
+        entry = self._memory.get(key)
+        if entry and entry[1] > now:
+            self._memory.move_to_end(key)
+            return entry[0], "hit"
+        self._memory.pop(key, None)
+        row = self._db().execute(
+            "SELECT value, expires_at FROM api_cache WHERE namespace = ? AND key = ? AND expires_at > ?",
+            (self.namespace, key, now)
+        ).fetchone()
+        if row:
+            value = json.loads(row[0])
+            self._remember(key, value, row[1])
+            return value, "disk_hit"
+        return _MISSING, "miss"
+
+    def _count(self, result):
+        with self._lock:
+            if result == "hit":
+                self.hits += 1
+            elif result == "disk_hit":
+                self.disk_hits += 1
+            else:
+                self.misses += 1
+        metrics.inc("eventmind_cache_requests_total", cache=self.namespace, result=result)
+
+    def _remember(self, key, value, expires_at):
+        self._memory[key] = (value, expires_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
@@ -1,21 +1,31 @@
 #src/storage/database.py
+import hashlib
 import sqlite3
 import os
+import queue
+import threading
 import time
+from datetime import datetime, timezone
+from src.metrics import metrics
+from src.storage.enrichment_cache import event_fingerprint
 
 
 DB_PATH = "data/events.db"
+SQL_CHUNK_SIZE = 500  # stay well under SQLite's bound-parameter limit
 
 def init_db():
+    """Create data/events.db if needed and bring its schema up to date (see MIGRATIONS)."""
     os.makedirs("data", exist_ok=True)
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
-    # Check if events table exists
-    c.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='events'")
-    if not c.fetchone():
-        # Create table and indexes only if it doesn't exist
-        c.execute("""
-        CREATE TABLE events (
+    conn = connect()
+    try:
+        migrate(conn)
+    finally:
+        conn.close()
+
+def _migrate_base_schema(conn):
+    # IF NOT EXISTS throughout: databases created before migrations existed already have these
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS events (
             id TEXT PRIMARY KEY,
             name TEXT,
             url TEXT,
@@ -28,59 +38,547 @@ def init_db():
             summary TEXT,
             lead_score INTEGER
         )
-        """)
-        c.execute("CREATE INDEX idx_events_city ON events (city)")
-        c.execute("CREATE INDEX idx_events_start ON events (start_utc)")
-        c.execute("CREATE INDEX idx_events_score ON events (lead_score)")
-    conn.commit()
-    conn.close()
-
-def save_event(event: dict):
-    conn = sqlite3.connect(DB_PATH)
-    c = conn.cursor()
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_city ON events (city)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_start ON events (start_utc)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_score ON events (lead_score)")
+
+def _migrate_prescore(conn):
+    ensure_column(conn, "events", "prescore", "INTEGER")
+
+def _migrate_dashboard_indexes(conn):
+    # Dashboard ordering (src/storage/queries.py): score desc, id, optionally within a city
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_rank ON events (COALESCE(lead_score, -1) DESC, id)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_city_rank ON events (city, COALESCE(lead_score, -1) DESC, id)")
+
+def _migrate_search_index(conn):
+    init_search_index(conn)
+
+def _migrate_checkpoints(conn):
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS checkpoints (
+            name TEXT PRIMARY KEY,
+            last_id TEXT,
+            processed INTEGER DEFAULT 0,
+            updated_at REAL
+        )
+    """)
+
+def _migrate_start_epoch_and_timestamps(conn):
+    # Unix seconds so time-range scans compare integers instead of parsing ISO text
+    ensure_column(conn, "events", "start_epoch", "INTEGER")
+    ensure_column(conn, "events", "scraped_at", "INTEGER")
+    ensure_column(conn, "events", "enriched_at", "INTEGER")
+    conn.execute("""
+        UPDATE events SET start_epoch = CAST(strftime('%s', start_utc) AS INTEGER)
+        WHERE start_epoch IS NULL AND start_utc IS NOT NULL
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_city_start ON events (city, start_epoch)")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_start_epoch ON events (start_epoch)")
+    conn.execute("DROP INDEX IF EXISTS idx_events_start")
+
+def _migrate_run_journal(conn):
+    # Scraping progress for run.py --resume (src/storage/journal.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_queries (
+            query_key TEXT PRIMARY KEY,
+            last_page INTEGER NOT NULL DEFAULT 0,
+            done INTEGER NOT NULL DEFAULT 0,
+            updated_at REAL
+        )
+    """)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS run_events (
+            event_id TEXT PRIMARY KEY,
+            query_key TEXT NOT NULL,
+            page INTEGER,
+            status TEXT NOT NULL DEFAULT 'discovered',
+            updated_at REAL
+        )
+    """)
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_run_events_query ON run_events (query_key, status)")
+
+def _migrate_change_tracking(conn):
+    # payload_hash: what we stored last; enrichment_hash: the fields summaries depend on;
+    # checked_at: last fetch, changed or not (see _UPSERT_EVENT_SQL)
+    ensure_column(conn, "events", "payload_hash", "TEXT")
+    ensure_column(conn, "events", "enrichment_hash", "TEXT")
+    ensure_column(conn, "events", "source_changed", "TEXT")
+    ensure_column(conn, "events", "checked_at", "INTEGER")
+    conn.row_factory = sqlite3.Row
     try:
-        # Check if event exists
-        c.execute("SELECT id FROM events WHERE id = ?", (event["id"],))
-        if c.fetchone():
-            print(f"ℹ️ Skipped event {event['id']}: Already exists")
-            return
-        # Insert new event
-        c.execute("""
-        INSERT OR REPLACE INTO events (
-            id, name, url, start_utc, city, country, is_free, venue_name, category_name
-        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            event["id"],
-            event["name"],
-            event["url"],
-            event["start_utc"],
-            event.get("city", ""),
-            event.get("country", ""),
-            event["is_free"],
-            event.get("venue_name", ""),
-            event.get("category_name", "")
-        ))
-        conn.commit()
-        print(f"✅ Stored: {event['name']}")
-    except sqlite3.Error as e:
-        print(f"❌ Failed to save event {event.get('id', 'unknown')}: {e}")
+        rows = conn.execute(f"SELECT id, {', '.join(PAYLOAD_COLUMNS)} FROM events").fetchall()
     finally:
-        conn.close()
+        conn.row_factory = None
+    conn.executemany(
+        "UPDATE events SET payload_hash = ?, enrichment_hash = ?, checked_at = scraped_at WHERE id = ?",
+        [(payload_hash(dict(row)), event_fingerprint(dict(row)), row["id"]) for row in rows]
+    )
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_events_checked ON events (checked_at)")
 
-def update_event_summary(event_id: str, summary: str):
-    for _ in range(3):
+def _migrate_api_cache(conn):
+    # Persistent layer of TTLCache (src/storage/cache.py)
+    conn.execute("""
+        CREATE TABLE IF NOT EXISTS api_cache (
+            namespace TEXT NOT NULL,
+            key TEXT NOT NULL,
+            value TEXT NOT NULL,
+            expires_at REAL NOT NULL,
+            PRIMARY KEY (namespace, key)
+        )
+    """)
+
+# Applied in order; PRAGMA user_version records how many have run. Append new
+# steps at the end and never edit or reorder released ones.
+MIGRATIONS = [
+    _migrate_base_schema,
+    _migrate_prescore,
+    _migrate_dashboard_indexes,
+    _migrate_search_index,
+    _migrate_checkpoints,
+    _migrate_start_epoch_and_timestamps,
+    _migrate_run_journal,
+    _migrate_change_tracking,
+    _migrate_api_cache,
+]
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+def migrate(conn: sqlite3.Connection) -> int:
+    """Apply pending MIGRATIONS, each in its own transaction; returns the new schema version."""
+    version = schema_version(conn)
+    if version > len(MIGRATIONS):
+        raise RuntimeError(f"{DB_PATH} has schema version {version}, newer than this code ({len(MIGRATIONS)})")
+    for number in range(version + 1, len(MIGRATIONS) + 1):
+        conn.execute("BEGIN IMMEDIATE")
         try:
-            conn = sqlite3.connect(DB_PATH)
-            c = conn.cursor()
-            c.execute("UPDATE events SET summary = ? WHERE id = ?", (summary, event_id))
+            # Another process may have migrated while we waited for the write lock
+            if schema_version(conn) >= number:
+                conn.rollback()
+                continue
+            MIGRATIONS[number - 1](conn)
+            conn.execute(f"PRAGMA user_version = {number}")
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        print(f"🛠️ Applied schema migration {number}: {MIGRATIONS[number - 1].__name__.lstrip('_')}")
+    return len(MIGRATIONS)
+
+SEARCH_COLUMNS = ("name", "summary", "venue_name", "category_name")
+
+def init_search_index(conn: sqlite3.Connection):
+    """Create the events_fts full-text index and the triggers that keep it in sync.
+
+    events_fts is an external-content FTS5 table: it stores only the index
+    and reads column values from events by rowid, so every writer (EventWriter,
+    save_event, summaries) is covered by the triggers without extra code.
+    Built once from existing rows when first created.
+    """
+    if conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'events_fts'").fetchone():
+        return
+    columns = ", ".join(SEARCH_COLUMNS)
+    new_values = ", ".join(f"new.{col}" for col in SEARCH_COLUMNS)
+    old_values = ", ".join(f"old.{col}" for col in SEARCH_COLUMNS)
+    conn.execute(f"""
+        CREATE VIRTUAL TABLE events_fts USING fts5(
+            {columns}, content='events', content_rowid='rowid', tokenize='porter unicode61'
+        )
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER events_fts_insert AFTER INSERT ON events BEGIN
+            INSERT INTO events_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER events_fts_delete AFTER DELETE ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+        END
+    """)
+    conn.execute(f"""
+        CREATE TRIGGER events_fts_update AFTER UPDATE OF {columns} ON events BEGIN
+            INSERT INTO events_fts (events_fts, rowid, {columns}) VALUES ('delete', old.rowid, {old_values});
+            INSERT INTO events_fts (rowid, {columns}) VALUES (new.rowid, {new_values});
+        END
+    """)
+    rebuild_search_index(conn)
+
+def rebuild_search_index(conn: sqlite3.Connection = None):
+    """Re-index every event (e.g. after a VACUUM, which may renumber rowids)."""
+    own = conn is None
+    conn = conn or connect()
+    try:
+        conn.execute("INSERT INTO events_fts (events_fts) VALUES ('rebuild')")
+        if own:
+            conn.commit()
+    finally:
+        if own:
+            conn.close()
+
+def ensure_column(conn: sqlite3.Connection, table: str, column: str, declaration: str):
+    """Add `column` to an existing table if an older database lacks it."""
+    columns = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+    if column not in columns:
+        conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {declaration}")
+
+def get_existing_event_ids(event_ids, checked_since: int = None) -> set:
+    """Return the subset of `event_ids` already stored, using bulk IN queries.
+
+    With `checked_since` (Unix seconds), only rows fetched at or after then count.
+    """
+    event_ids = list(dict.fromkeys(str(eid) for eid in event_ids))
+    existing = set()
+    if not event_ids:
+        return existing
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        c = conn.cursor()
+        for start in range(0, len(event_ids), SQL_CHUNK_SIZE):
+            chunk = event_ids[start:start + SQL_CHUNK_SIZE]
+            placeholders = ",".join("?" * len(chunk))
+            if checked_since is None:
+                c.execute(f"SELECT id FROM events WHERE id IN ({placeholders})", chunk)
+            else:
+                c.execute(f"SELECT id FROM events WHERE id IN ({placeholders}) AND COALESCE(checked_at, 0) >= ?",
+                          chunk + [checked_since])
+            existing.update(row[0] for row in c.fetchall())
+    finally:
+        conn.close()
+    return existing
+
+def filter_new_event_ids(event_ids, stale_after: float = None) -> list:
+    """Drop IDs that are already stored, preserving the original order.
+
+    With `stale_after` (seconds), stored events last fetched longer ago than
+    that are kept too, so they get re-checked for changes.
+    """
+    checked_since = int(time.time() - stale_after) if stale_after is not None else None
+    existing = get_existing_event_ids(event_ids, checked_since)
+    return [eid for eid in event_ids if str(eid) not in existing]
+
+EVENT_COLUMNS = (
+    "id", "name", "url", "start_utc", "city", "country", "is_free", "venue_name", "category_name", "prescore",
+    "start_epoch", "scraped_at", "payload_hash", "enrichment_hash", "source_changed", "checked_at"
+)
+# Scraped columns whose values make up payload_hash
+PAYLOAD_COLUMNS = ("name", "url", "start_utc", "city", "country", "is_free", "venue_name", "category_name")
+# Enrichment output, cleared when enrichment_hash changes so the event is summarized again
+_ENRICHMENT_COLUMNS = ("summary", "lead_score", "enriched_at")
+_INSERT_EVENT_SQL = f"""
+INSERT INTO events ({", ".join(EVENT_COLUMNS)})
+VALUES ({", ".join("?" * len(EVENT_COLUMNS))})
+"""
+_INSERT_EVENT_OR_SKIP_SQL = _INSERT_EVENT_SQL + "ON CONFLICT(id) DO NOTHING"
+# Rewrites a stored row only if its payload changed (unchanged rows are not
+# touched, so they cost no FTS re-indexing), and keeps the summary and
+# lead_score unless a field they depend on changed
+_UPSERT_EVENT_SQL = _INSERT_EVENT_SQL + "ON CONFLICT(id) DO UPDATE SET " + ", ".join(
+    [f"{col} = excluded.{col}" for col in EVENT_COLUMNS if col != "id"] +
+    [f"{col} = CASE WHEN events.enrichment_hash IS excluded.enrichment_hash THEN events.{col} END"
+     for col in _ENRICHMENT_COLUMNS]
+) + " WHERE events.payload_hash IS NOT excluded.payload_hash"
+_TOUCH_EVENT_SQL = "UPDATE events SET checked_at = ? WHERE id = ?"
+_UPDATE_SUMMARY_SQL = "UPDATE events SET summary = ?, lead_score = ?, enriched_at = ? WHERE id = ?"
+
+def connect(db_path: str = None) -> sqlite3.Connection:
+    """Open a connection tuned for concurrent readers and one writer."""
+    conn = sqlite3.connect(db_path or DB_PATH, timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def to_epoch(value) -> int:
+    """Unix seconds for an ISO 8601 string ("2025-06-01T17:00:00Z"), date, datetime or number."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    if not isinstance(value, datetime):
+        value = datetime(value.year, value.month, value.day)
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return int(value.timestamp())
+
+def payload_hash(event: dict) -> str:
+    """Hash of the stored scraped fields; a refetch with the same hash changes nothing."""
+    values = "\x1f".join("" if event.get(col) is None else str(event.get(col)) for col in PAYLOAD_COLUMNS)
+    return hashlib.sha256(values.encode()).hexdigest()
+
+def _event_row(event: dict) -> tuple:
+    now = int(time.time())
+    return (
+        event["id"],
+        event["name"],
+        event["url"],
+        event["start_utc"],
+        event.get("city", ""),
+        event.get("country", ""),
+        event["is_free"],
+        event.get("venue_name", ""),
+        event.get("category_name", ""),
+        event.get("prescore"),
+        to_epoch(event["start_utc"]),
+        now,
+        payload_hash(event),
+        event_fingerprint(event),
+        event.get("changed"),
+        now
+    )
+
+class EventWriter:
+    """Buffered storage writer that owns a single long-lived connection.
+
+    Events and summaries are queued with add_event/add_summary and written with
+    executemany in one transaction per batch. New events are inserted with
+    ON CONFLICT upserts; with overwrite=True existing rows are rewritten only
+    when their payload_hash changed (the rest just get checked_at bumped, and
+    count as skipped), otherwise existing rows are left alone. A change to
+    the enrichment-relevant fields also clears summary and lead_score, so
+    the next sum_agent.py run re-enriches just those events.
+
+    If a commit fails, the batch stays buffered (the next flush retries it)
+    and the sqlite3.Error is raised, so callers never treat lost rows as stored.
+    """
+
+    def __init__(self, db_path: str = None, batch_size: int = 500, overwrite: bool = False):
+        self.conn = connect(db_path)
+        self.batch_size = batch_size
+        self.overwrite = overwrite
+        self.rows_written = 0
+        self.rows_skipped = 0
+        self.batches = 0
+        self.flush_seconds = 0.0
+        self._events = []
+        self._summaries = []
+        self._lock = threading.Lock()
+
+    def add_event(self, event: dict):
+        with self._lock:
+            self._events.append(_event_row(event))
+            if len(self._events) >= self.batch_size:
+                self._flush()
+
+    def add_summary(self, event_id: str, summary: str, lead_score: int = None):
+        with self._lock:
+            self._summaries.append((summary, lead_score, int(time.time()), event_id))
+            if len(self._summaries) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._events and not self._summaries:
             return
-        except sqlite3.OperationalError as e:
-            if "database is locked" in str(e):
-                time.sleep(0.1)
+        events, summaries = self._events, self._summaries
+        self._events, self._summaries = [], []
+        start = time.perf_counter()
+        # Cursor rowcounts, not total_changes: the latter also counts rows touched by the FTS triggers
+        changed = 0
+        try:
+            with self.conn:
+                if events:
+                    sql = _UPSERT_EVENT_SQL if self.overwrite else _INSERT_EVENT_OR_SKIP_SQL
+                    changed += self.conn.executemany(sql, events).rowcount
+                    if self.overwrite:
+                        self.conn.executemany(_TOUCH_EVENT_SQL, [(row[-1], row[0]) for row in events])
+                if summaries:
+                    changed += self.conn.executemany(_UPDATE_SUMMARY_SQL, summaries).rowcount
+        except sqlite3.Error as e:
+            print(f"❌ Failed to write batch of {len(events) + len(summaries)} rows: {e}")
+            metrics.inc("eventmind_db_rows_total", len(events) + len(summaries), result="failed")
+            self._events, self._summaries = events + self._events, summaries + self._summaries
+            raise
+        elapsed = time.perf_counter() - start
+        metrics.observe("eventmind_db_commit_seconds", elapsed)
+        metrics.inc("eventmind_db_rows_total", changed, result="written")
+        metrics.inc("eventmind_db_rows_total", len(events) + len(summaries) - changed, result="skipped")
+        self.flush_seconds += elapsed
+        self.batches += 1
+        self.rows_written += changed
+        self.rows_skipped += len(events) + len(summaries) - changed
+        print(f"✅ Stored batch: {changed} rows written, {len(events) + len(summaries) - changed} skipped")
+
+    def unsummarized(self, event_ids) -> set:
+        """The subset of stored `event_ids` with no summary: new rows, or ones whose enrichment was cleared."""
+        event_ids = [str(eid) for eid in event_ids]
+        missing = set()
+        with self._lock:
+            for start in range(0, len(event_ids), SQL_CHUNK_SIZE):
+                chunk = event_ids[start:start + SQL_CHUNK_SIZE]
+                missing.update(row[0] for row in self.conn.execute(
+                    f"SELECT id FROM events WHERE summary IS NULL AND id IN ({','.join('?' * len(chunk))})", chunk))
+        return missing
+
+    def stats(self) -> dict:
+        return {
+            "rows_written": self.rows_written,
+            "rows_skipped": self.rows_skipped,
+            "batches": self.batches,
+            "flush_seconds": round(self.flush_seconds, 4),
+            "rows_per_sec": round(self.rows_written / self.flush_seconds, 1) if self.flush_seconds else 0.0
+        }
+
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except sqlite3.Error:
+            if exc_type is None:
+                raise  # otherwise keep the original exception
+
+class BackgroundWriter(threading.Thread):
+    """Single writer thread that drains a queue into an EventWriter.
+
+    Producers (fetch threads, summarization result loops) call submit_event or
+    submit_summary and never touch SQLite themselves, so any number of them can
+    run without lock contention. Buffered rows are committed when a batch fills
+    or after `flush_interval` seconds without new work.
+
+    A failed commit keeps its rows buffered and is retried on the next flush;
+    until one succeeds, sync() and close() raise the sqlite3.Error so callers
+    don't checkpoint past rows that never reached the database.
+    """
+
+    _STOP = object()
+
+    def __init__(self, db_path: str = None, batch_size: int = 50, flush_interval: float = 1.0,
+                 overwrite: bool = False, maxsize: int = 0):
+        super().__init__(name="eventmind-writer", daemon=True)
+        self.writer = EventWriter(db_path, batch_size=batch_size, overwrite=overwrite)
+        self.flush_interval = flush_interval
+        self.queue = queue.Queue(maxsize=maxsize)
+        self.error = None
+
+    def submit_event(self, event: dict):
+        self.queue.put(("event", (event,)))
+
+    def submit_summary(self, event_id: str, summary: str, lead_score: int = None):
+        self.queue.put(("summary", (event_id, summary, lead_score)))
+
+    def sync(self):
+        """Block until everything submitted so far is committed; raises if that failed."""
+        done = threading.Event()
+        self.queue.put(("sync", done))
+        done.wait()
+        if self.error:
+            raise self.error
+
+    def _write(self, method, *args):
+        try:
+            method(*args)
+            if method == self.writer.flush:
+                self.error = None
+        except sqlite3.Error as e:
+            self.error = e
+
+    def run(self):
+        while True:
+            try:
+                item = self.queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                self._write(self.writer.flush)
+                continue
+            if item is self._STOP:
+                break
+            kind, payload = item
+            if kind == "event":
+                self._write(self.writer.add_event, *payload)
+            elif kind == "summary":
+                self._write(self.writer.add_summary, *payload)
             else:
+                self._write(self.writer.flush)
+                payload.set()
+        self._write(self.writer.close)
+
+    def stats(self) -> dict:
+        return self.writer.stats()
+
+    def close(self):
+        """Flush everything still queued and stop the thread; raises if the last commit failed."""
+        self.queue.put(self._STOP)
+        self.join()
+        if self.error:
+            raise self.error
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.close()
+        except sqlite3.Error:
+            if exc_type is None:
                 raise
-        finally:
-            conn.close()
-            
-    raise sqlite3.OperationalError("Failed to update summary after retries")
\ No newline at end of file
+
+def save_event(event: dict, overwrite: bool = False):
+    """Insert an event; with overwrite=True update an existing row if its payload changed.
+
+    Summary and lead_score survive a refresh unless enrichment-relevant
+    fields changed (see EventWriter). Prefer EventWriter for more than a
+    handful of rows.
+    """
+    conn = connect()
+    try:
+        row = _event_row(event)
+        with conn:
+            c = conn.execute(_UPSERT_EVENT_SQL if overwrite else _INSERT_EVENT_OR_SKIP_SQL, row)
+            if overwrite:
+                conn.execute(_TOUCH_EVENT_SQL, (row[-1], row[0]))
+        if c.rowcount:
+            print(f"✅ Stored: {event['name']}")
+        else:
+            print(f"ℹ️ Skipped event {event['id']}: {'Unchanged' if overwrite else 'Already exists'}")
+    except sqlite3.Error as e:
+        print(f"❌ Failed to save event {event.get('id', 'unknown')}: {e}")
+    finally:
+        conn.close()
+
+def update_event_summary(event_id: str, summary: str, lead_score: int = None):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(_UPDATE_SUMMARY_SQL, (summary, lead_score, int(time.time()), event_id))
+    finally:
+        conn.close()
+
+def load_checkpoint(name: str) -> tuple:
+    """Return (last_id, processed) saved under `name`, or (None, 0)."""
+    conn = connect()
+    try:
+        row = conn.execute("SELECT last_id, processed FROM checkpoints WHERE name = ?", (name,)).fetchone()
+        return (row[0], row[1]) if row else (None, 0)
+    finally:
+        conn.close()
+
+def save_checkpoint(name: str, last_id: str, processed: int):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (name, last_id, processed, updated_at) VALUES (?, ?, ?, ?)",
+                (name, last_id, processed, time.time())
+            )
+    finally:
+        conn.close()
+
+def clear_checkpoint(name: str):
+    conn = connect()
+    try:
+        with conn:
+            conn.execute("DELETE FROM checkpoints WHERE name = ?", (name,))
+    finally:
+        conn.close()
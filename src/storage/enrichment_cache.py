@@ -0,0 +1,139 @@
+# src/storage/enrichment_cache.py
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from src.metrics import metrics
+
+CACHE_PATH = os.getenv("ENRICHMENT_CACHE_PATH", "data/enrichment_cache.db")
+# Bump to invalidate every cached search result and LLM output at once
+CACHE_VERSION = os.getenv("ENRICHMENT_CACHE_VERSION", "1")
+MAX_BYTES = int(float(os.getenv("ENRICHMENT_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+# Fields that describe what an event *is*; URL and date are left out so weekly
+# meetups and re-listed events of the same series share one entry.
+_KEY_FIELDS = ("name", "city", "venue_name", "category_name", "is_free")
+
+def _normalize(value) -> str:
+    return re.sub(r"\s+", " ", str(value if value is not None else "")).strip().lower()
+
+def event_fingerprint(data: dict) -> str:
+    """Stable hash of the normalized, enrichment-relevant event fields."""
+    normalized = "\x1f".join(_normalize(data.get(field)) for field in _KEY_FIELDS)
+    return hashlib.sha256(normalized.encode()).hexdigest()
+
+class EnrichmentCache:
+    """On-disk cache of Serper results and LLM outputs with size-based LRU eviction.
+
+    Keys include CACHE_VERSION plus whatever the caller passes (prompt
+    version, model, event fingerprint, search query), so changing any of them
+    naturally misses. When the stored values exceed `max_bytes`, the least
+    recently used entries are evicted.
+    """
+
+    def __init__(self, path: str = None, max_bytes: int = MAX_BYTES, version: str = CACHE_VERSION,
+                 enabled: bool = None):
+        self.path = path or CACHE_PATH
+        self.max_bytes = max_bytes
+        self.version = version
+        # Read at construction so worker processes honour ENRICHMENT_CACHE=0 set by the parent
+        self.enabled = enabled if enabled is not None else os.getenv("ENRICHMENT_CACHE", "1") != "0"
+        self.hits = 0
+        self.misses = 0
+        self._conn = None
+        self._approx_bytes = None
+        self._lock = threading.Lock()
+
+    def _db(self):
+        if self._conn is None:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS enrichment_cache (
+                    key TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    last_used REAL NOT NULL
+                )
+            """)
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_enrichment_cache_used ON enrichment_cache (last_used)")
+            self._conn.commit()
+        return self._conn
+
+    def key(self, *parts) -> str:
+        raw = "\x1f".join(str(part) for part in (self.version,) + parts)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(self, key: str):
+        if not self.enabled:
+            return None
+        with self._lock:
+            conn = self._db()
+            row = conn.execute("SELECT value FROM enrichment_cache WHERE key = ?", (key,)).fetchone()
+            if not row:
+                self.misses += 1
+                metrics.inc("eventmind_cache_requests_total", cache="enrichment", result="miss")
+                return None
+            conn.execute("UPDATE enrichment_cache SET last_used = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+            self.hits += 1
+            metrics.inc("eventmind_cache_requests_total", cache="enrichment", result="hit")
+            return json.loads(row[0])
+
+    def set(self, key: str, value, kind: str):
+        if not self.enabled:
+            return
+        payload = json.dumps(value)
+        with self._lock:
+            conn = self._db()
+            with conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO enrichment_cache (key, kind, value, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    (key, kind, payload, len(payload), time.time())
+                )
+                # Running estimate (other processes write too); only recount when it crosses the budget
+                if self._approx_bytes is None:
+                    self._approx_bytes = self._total_bytes(conn)
+                else:
+                    self._approx_bytes += len(payload)
+                if self._approx_bytes > self.max_bytes:
+                    self._evict(conn)
+
+    def _total_bytes(self, conn) -> int:
+        return conn.execute("SELECT COALESCE(SUM(size), 0) FROM enrichment_cache").fetchone()[0]
+
+    def _evict(self, conn):
+        total = self._total_bytes(conn)
+        self._approx_bytes = total
+        if total <= self.max_bytes:
+            return
+        # Drop least recently used entries until back under 90% of the budget
+        excess = total - int(self.max_bytes * 0.9)
+        freed = 0
+        victims = []
+        for key, size in conn.execute("SELECT key, size FROM enrichment_cache ORDER BY last_used"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        conn.executemany("DELETE FROM enrichment_cache WHERE key = ?", victims)
+        self._approx_bytes = total - freed
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_enrichment_cache() -> EnrichmentCache:
+    """Process-wide cache instance (each worker process opens its own connection)."""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = EnrichmentCache()
+        return _cache
@@ -0,0 +1,104 @@
+# src/storage/journal.py
+
+import threading
+import time
+from src.storage.database import connect, SQL_CHUNK_SIZE
+
+# Fetch outcomes that count as done; "discovered" IDs are still to be fetched
+FINAL_STATUSES = ("stored", "skipped")
+
+def query_key(query: dict) -> str:
+    # max_events is left out so a resumed run may ask for more (or fewer) events
+    return f"{query['state']}|{query['city']}|{query['category']}"
+
+class RunJournal:
+    """Scraping progress in SQLite, so an interrupted run.py can --resume.
+
+    Per query it keeps the last listing page whose IDs were saved and
+    whether discovery finished; per event ID whether it still needs fetching
+    ("discovered") or is done ("stored", or "skipped" as online/unavailable).
+    A page and its IDs are committed together, so a crash never loses
+    discovered IDs and a resumed run never loads the same page twice.
+    Safe to share between threads.
+    """
+
+    def __init__(self, db_path: str = None):
+        self.conn = connect(db_path)
+        self._lock = threading.Lock()
+
+    def start(self, query: dict):
+        """Forget earlier progress for `query` (a fresh, non-resumed run)."""
+        key = query_key(query)
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM run_events WHERE query_key = ?", (key,))
+            self.conn.execute("DELETE FROM run_queries WHERE query_key = ?", (key,))
+
+    def resume_point(self, query: dict) -> tuple:
+        """(next page to load, IDs already discovered for `query`, whether discovery finished)."""
+        key = query_key(query)
+        with self._lock:
+            row = self.conn.execute("SELECT last_page, done FROM run_queries WHERE query_key = ?", (key,)).fetchone()
+            seen = [r[0] for r in self.conn.execute(
+                "SELECT event_id FROM run_events WHERE query_key = ? ORDER BY rowid", (key,))]
+        last_page, done = row if row else (0, 0)
+        return last_page + 1, seen, bool(done)
+
+    def pending_ids(self, query: dict) -> list:
+        """IDs discovered for `query` that are neither done nor already stored, in discovery order."""
+        with self._lock:
+            return [r[0] for r in self.conn.execute(
+                f"""
+                SELECT event_id FROM run_events
+                WHERE query_key = ? AND status NOT IN ({', '.join('?' * len(FINAL_STATUSES))})
+                  AND event_id NOT IN (SELECT id FROM events)
+                ORDER BY rowid
+                """,
+                (query_key(query), *FINAL_STATUSES)
+            )]
+
+    def record_page(self, query: dict, page: int, event_ids: list):
+        """Save one listing page's new IDs and advance the query's last page, atomically."""
+        key, now = query_key(query), time.time()
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO run_events (event_id, query_key, page, updated_at) VALUES (?, ?, ?, ?)",
+                [(eid, key, page, now) for eid in event_ids]
+            )
+            self.conn.execute(
+                """
+                INSERT INTO run_queries (query_key, last_page, updated_at) VALUES (?, ?, ?)
+                ON CONFLICT(query_key) DO UPDATE SET last_page = MAX(last_page, excluded.last_page),
+                                                     updated_at = excluded.updated_at
+                """,
+                (key, page, now)
+            )
+
+    def finish(self, query: dict):
+        """Mark discovery for `query` complete; a resumed run then only fetches pending IDs."""
+        with self._lock, self.conn:
+            self.conn.execute(
+                """
+                INSERT INTO run_queries (query_key, done, updated_at) VALUES (?, 1, ?)
+                ON CONFLICT(query_key) DO UPDATE SET done = 1, updated_at = excluded.updated_at
+                """,
+                (query_key(query), time.time())
+            )
+
+    def mark(self, event_ids, status: str):
+        """Record the fetch outcome ("stored" or "skipped") of `event_ids`."""
+        event_ids = [str(eid) for eid in event_ids]
+        now = time.time()
+        with self._lock, self.conn:
+            for start in range(0, len(event_ids), SQL_CHUNK_SIZE):
+                chunk = event_ids[start:start + SQL_CHUNK_SIZE]
+                self.conn.execute(
+                    f"UPDATE run_events SET status = ?, updated_at = ? WHERE event_id IN ({', '.join('?' * len(chunk))})",
+                    (status, now, *chunk)
+                )
+
+    def stats(self) -> dict:
+        with self._lock:
+            return dict(self.conn.execute("SELECT status, COUNT(*) FROM run_events GROUP BY status").fetchall())
+
+    def close(self):
+        self.conn.close()
@@ -0,0 +1,181 @@
+# src/storage/queries.py
+
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from src.storage.database import DB_PATH, to_epoch
+
+# Dashboard sort order; unscored events sort last
+_SCORE_KEY = "COALESCE(lead_score, -1)"
+_LIST_COLUMNS = "id, name, url, start_utc, city, category_name, is_free, prescore, summary, lead_score"
+# bm25 column weights for events_fts (name, summary, venue_name, category_name)
+SEARCH_WEIGHTS = (10.0, 4.0, 2.0, 1.0)
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+class QueryCache:
+    """Small LRU of query results, dropped whenever the database changes.
+
+    Reads go through one long-lived read-only connection shared by all
+    threads (Streamlit runs every session on its own thread). `PRAGMA
+    data_version` on that connection changes whenever any other connection
+    commits, which is exactly when cached results go stale.
+    """
+
+    def __init__(self, db_path: str = None, max_entries: int = 256):
+        self.db_path = db_path or DB_PATH
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._conn = None
+        self._lock = threading.Lock()
+
+    def fetch(self, sql: str, params: tuple = ()) -> list:
+        """Rows of `sql` as dicts, served from cache while the database is unchanged."""
+        key = (sql, tuple(params))
+        with self._lock:
+            if self._conn is None:
+                self._conn = sqlite3.connect(f"file:{self.db_path}?mode=ro", uri=True, timeout=30,
+                                             check_same_thread=False)
+                self._conn.row_factory = sqlite3.Row
+            version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+            rows = [dict(row) for row in self._conn.execute(sql, params).fetchall()]
+            self._entries[key] = rows
+            if len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+            return rows
+
+    def stats(self) -> dict:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+_cache = None
+_cache_lock = threading.Lock()
+
+def get_query_cache() -> QueryCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None or _cache.db_path != DB_PATH:
+            _cache = QueryCache()
+        return _cache
+
+def _where(prefix="", city=None, category=None, start_from=None, start_to=None, min_score=None, max_score=None,
+           enriched_only=False) -> tuple:
+    """WHERE clause and parameters for the dashboard filters (None = no filter).
+
+    start_from/start_to accept ISO strings, dates, datetimes or epoch seconds.
+    `prefix` qualifies column names (e.g. "e.") when events is joined.
+    """
+    clauses, params = [], []
+    if city:
+        clauses.append(f"{prefix}city = ?")
+        params.append(city)
+    if category:
+        clauses.append(f"{prefix}category_name = ?")
+        params.append(category)
+    if start_from:
+        clauses.append(f"{prefix}start_epoch >= ?")
+        params.append(to_epoch(start_from))
+    if start_to:
+        clauses.append(f"{prefix}start_epoch < ?")
+        params.append(to_epoch(start_to))
+    if min_score is not None:
+        clauses.append(f"{prefix}lead_score >= ?")
+        params.append(min_score)
+    if max_score is not None:
+        clauses.append(f"{prefix}lead_score <= ?")
+        params.append(max_score)
+    if enriched_only:
+        clauses.append(f"{prefix}summary IS NOT NULL")
+    return (" AND ".join(clauses) or "1"), params
+
+def list_events(limit: int = 50, after: tuple = None, **filters) -> tuple:
+    """One page of events ordered by lead_score (desc) then id.
+
+    `after` is the cursor returned for the previous page, so deep pages cost
+    the same as the first (keyset pagination, no OFFSET). Returns
+    (rows, next_cursor); next_cursor is None on the last page.
+    """
+    where, params = _where(**filters)
+    if after:
+        where += f" AND ({_SCORE_KEY} < ? OR ({_SCORE_KEY} = ? AND id > ?))"
+        params += [after[0], after[0], after[1]]
+    rows = get_query_cache().fetch(
+        f"SELECT {_LIST_COLUMNS} FROM events WHERE {where} ORDER BY {_SCORE_KEY} DESC, id LIMIT ?",
+        tuple(params) + (limit + 1,)
+    )
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    return rows, (last["lead_score"] if last["lead_score"] is not None else -1, last["id"])
+
+def upcoming_events(city: str, within_days: float = None, limit: int = 50, now: float = None) -> list:
+    """Next events in `city`, soonest first: a range scan on idx_events_city_start."""
+    start = int(now if now is not None else time.time())
+    sql = f"SELECT {_LIST_COLUMNS} FROM events WHERE city = ? AND start_epoch >= ?"
+    params = [city, start]
+    if within_days is not None:
+        sql += " AND start_epoch < ?"
+        params.append(start + int(within_days * 86400))
+    return get_query_cache().fetch(sql + " ORDER BY start_epoch LIMIT ?", tuple(params) + (limit,))
+
+def count_events(**filters) -> int:
+    where, params = _where(**filters)
+    return get_query_cache().fetch(f"SELECT COUNT(*) AS n FROM events WHERE {where}", tuple(params))[0]["n"]
+
+def distinct_values(column: str) -> list:
+    """Sorted non-empty values of `column` ("city" or "category_name") for filter widgets."""
+    if column not in ("city", "category_name"):
+        raise ValueError(f"unsupported column: {column}")
+    rows = get_query_cache().fetch(
+        f"SELECT DISTINCT {column} AS value FROM events WHERE {column} IS NOT NULL AND {column} != '' ORDER BY 1"
+    )
+    return [row["value"] for row in rows]
+
+def fts_query(text: str) -> str:
+    """Turn free text into an FTS5 query: every word must match, the last one as a prefix.
+
+    Words are quoted, so FTS5 syntax characters typed by users cannot break
+    the query. Returns "" when there is nothing to search for.
+    """
+    tokens = _TOKEN_RE.findall(text or "")
+    if not tokens:
+        return ""
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+def search_events(text: str, limit: int = 50, **filters) -> list:
+    """Events matching `text` in name, summary, venue or category, best match first.
+
+    Ranked by bm25 with SEARCH_WEIGHTS (a name match outranks a summary
+    match); takes the same filters as list_events. Each row carries a
+    `snippet` of the matching summary text.
+    """
+    match = fts_query(text)
+    if not match:
+        return []
+    where, params = _where("e.", **filters)
+    columns = ", ".join(f"e.{col.strip()}" for col in _LIST_COLUMNS.split(","))
+    weights = ", ".join(str(w) for w in SEARCH_WEIGHTS)
+    return get_query_cache().fetch(
+        f"""
+        SELECT {columns}, snippet(events_fts, 1, '**', '**', '…', 12) AS snippet
+        FROM events_fts JOIN events e ON e.rowid = events_fts.rowid
+        WHERE events_fts MATCH ? AND {where}
+        ORDER BY bm25(events_fts, {weights})
+        LIMIT ?
+        """,
+        (match, *params, limit)
+    )
@@ -3,9 +3,22 @@
 import sqlite3
 import os
 import time
+import argparse
+import asyncio
+import signal
+import threading
+import json
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
 from multiprocessing import Pool
 from crewai import Agent, Crew, Process, Task, LLM
 import logging
+from src.storage.database import BackgroundWriter, DB_PATH, init_db, load_checkpoint, save_checkpoint, clear_checkpoint
+from src.metrics import metrics
+from src.prescore import PRESCORE_THRESHOLD, backfill_prescores
+from src.ratelimit import TokenBucket
+from src.storage.enrichment_cache import get_enrichment_cache, event_fingerprint
 
 # Configure logging
 logging.basicConfig(
@@ -15,37 +28,33 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-def update_event_summary(event_id, data):
-    """Update event with summary, lead_score, and retry logic."""
-    for _ in range(3):
-        try:
-            conn = sqlite3.connect("data/events.db")
-            c = conn.cursor()
-            c.execute("""
-                UPDATE events
-                SET summary = ?, lead_score = ?
-                WHERE id = ?
-            """, (
-                data.get('summary', ''),
-                data.get('lead_score', None),
-                event_id
-            ))
-            conn.commit()
-            return
-        except sqlite3.OperationalError as e:
-            if "database is locked" in str(e):
-                time.sleep(0.1)
-            else:
-                raise
-        finally:
-            conn.close()
-    raise sqlite3.OperationalError("Failed to update after retries")
+LLM_MODEL = os.getenv("LLM_MODEL", "nvidia_nim/meta/llama-3.2-3b-instruct")
+LLM_BASE_URL = os.getenv("LLM_BASE_URL")  # e.g. a local OpenAI-compatible stand-in for tests
+SERPER_BASE_URL = os.getenv("SERPER_BASE_URL")  # likewise for google.serper.dev
+EVENTS_PER_CALL = 8
+SERPER_RATE_PER_MIN = float(os.getenv("SERPER_RATE_PER_MIN", "300"))
+LLM_RATE_PER_MIN = float(os.getenv("LLM_RATE_PER_MIN", "40"))
+# Bump when a prompt changes so cached outputs from the old prompt are not reused
+CREW_PROMPT_VERSION = "crew-v1"
+BATCH_PROMPT_VERSION = "batch-v1"
+CREW_LLM_CALLS = 3  # researcher, analyzer and lead scorer each call the LLM at least once
+
+def build_llm(max_tokens=500):
+    """LLM client for the configured model; LLM_BASE_URL overrides the endpoint."""
+    kwargs = {"base_url": LLM_BASE_URL} if LLM_BASE_URL else {}
+    return LLM(
+        model=LLM_MODEL,
+        api_key=os.getenv("NVIDIA_NIM_API_KEY"),
+        temperature=0.6,
+        max_tokens=max_tokens,
+        **kwargs
+    )
 
 def fetch_event_data(event_id):
     """Fetch event data from SQLite database."""
     data = {}
     try:
-        conn = sqlite3.connect("data/events.db")
+        conn = sqlite3.connect(DB_PATH)
         c = conn.cursor()
         c.execute("""
             SELECT name, url, city, is_free, venue_name, category_name
@@ -70,13 +79,117 @@ def fetch_event_data(event_id):
         conn.close()
     return data
 
-def summarize_event(event):
-    """Summarize and score one event."""
- #   from crewai import Agent, Task, Crew, Process, LLM
+_worker = threading.local()
+# Per-process provider buckets shared by every thread; see configure_rate_limits
+_rate_limits = {}
+
+def build_rate_limits(serper_rate_per_min=SERPER_RATE_PER_MIN, llm_rate_per_min=LLM_RATE_PER_MIN):
+    """Token buckets for Serper and the LLM endpoint, allowing ~10s of burst."""
+    return {
+        'serper': TokenBucket(serper_rate_per_min / 60, capacity=max(1, serper_rate_per_min / 6)),
+        'llm': TokenBucket(llm_rate_per_min / 60, capacity=max(CREW_LLM_CALLS, llm_rate_per_min / 6))
+    }
+
+def configure_rate_limits(limits):
+    """Make summarize_event/summarize_batch wait on `limits` (from build_rate_limits) in this process."""
+    _rate_limits.clear()
+    _rate_limits.update(limits or {})
+
+def _throttle(provider, tokens=1):
+    bucket = _rate_limits.get(provider)
+    if bucket:
+        bucket.acquire(tokens)
+
+def build_search_tool():
+    """SerperDevTool whose results are cached on disk by query."""
     from crewai_tools import SerperDevTool
+
+    class CachedSerperDevTool(SerperDevTool):
+        def _run(self, **kwargs):
+            cache = get_enrichment_cache()
+            key = cache.key("serper", json.dumps(kwargs, sort_keys=True, default=str))
+            cached = cache.get(key)
+            if cached is not None:
+                return cached
+            metrics.inc("eventmind_search_requests_total")
+            with metrics.timer("eventmind_search_seconds"):
+                results = super()._run(**kwargs)
+            cache.set(key, results, kind="serper")
+            return results
+
+    return CachedSerperDevTool(base_url=SERPER_BASE_URL) if SERPER_BASE_URL else CachedSerperDevTool()
+
+def build_components():
+    """Build the search tool, LLM and the three CrewAI agents."""
     from dotenv import load_dotenv
 
     load_dotenv()
+    search_tool = build_search_tool()
+    llm = build_llm()
+
+    researcher = Agent(
+        role="Event Researcher",
+        goal="Gather event context from web using its URL",
+        backstory="""You're a senior event intelligence analyst with years of experience researching professional and tech conferences.
+        You specialize in using advanced search techniques to uncover detailed information about event audiences, industries, and speaker intent.
+        You know how to dig deeper into event listings, uncovering the business potential behind each gathering.""",
+        tools=[search_tool],
+        verbose=False,
+        llm=llm
+    )
+
+    analyzer = Agent(
+        role="Event Analyzer",
+        goal="Summarize events for sales teams in 2-3 crisp lines",
+        backstory="""You're a B2B content strategist with a sharp ability to condense complex event data into sales-focused summaries.
+        You've worked with sales enablement teams at SaaS companies and know exactly what makes an event valuable for outbound engagement.
+        You help sales teams quickly identify which events are worth pursuing by distilling value propositions clearly.""",
+        verbose=False,
+        llm=llm
+    )
+
+    lead_scorer = Agent(
+        role="Lead Scoring Analyst",
+        goal="Evaluate event potential for sales lead generation",
+        backstory="""You're a growth strategist specializing in B2B SaaS pipeline development. 
+        You've built lead scoring models used by SDR and GTM teams to prioritize outreach opportunities from events. 
+        Your strength is evaluating how well an event aligns with key buyer personas, company ICPs, and intent signals. 
+        You think like a sales leader who only wants to invest time in high-yield events.""",
+        verbose=False,
+        llm=llm
+    )
+
+    return {
+        'search_tool': search_tool,
+        'llm': llm,
+        'researcher': researcher,
+        'analyzer': analyzer,
+        'lead_scorer': lead_scorer
+    }
+
+def init_worker(serper_rate_per_min=None, llm_rate_per_min=None):
+    """Pool initializer: build this worker's components once, before any event.
+
+    With rates given, the worker throttles itself to that share of the
+    provider quotas; the parent passes quota / workers.
+    """
+    if serper_rate_per_min and llm_rate_per_min:
+        signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent handles Ctrl-C and stops cleanly
+        configure_rate_limits(build_rate_limits(serper_rate_per_min, llm_rate_per_min))
+    _worker.components = build_components()
+
+def get_worker_components():
+    """Components for the current worker process/thread, built on first use."""
+    if getattr(_worker, 'components', None) is None:
+        init_worker()
+    return _worker.components
+
+def summarize_event(event):
+    """Summarize and score one event.
+
+    Returns (event_id, {"summary", "lead_score"}) on success or (event_id, None).
+    Results are written by the caller's single writer, never by workers.
+    """
     event_id, event_url = event
     print(f"🧠 Processing event: {event_id}")
 
@@ -86,49 +199,22 @@ def summarize_event(event):
         if not data:
             logger.error(f"❌ Skipping event {event_id}: No data")
             #print(f"❌ Skipping event {event_id}: No data")
-            return event_id, False
-
-        # CrewAI setup
-        search_tool = SerperDevTool()
-        llm = LLM(
-            model="nvidia_nim/meta/llama-3.2-3b-instruct",
-            api_key=os.getenv("NVIDIA_NIM_API_KEY"),
-            temperature=0.6,
-            max_tokens=500
-        )
-        
-    
-        researcher = Agent(
-            role="Event Researcher",
-            goal="Gather event context from web using its URL",
-            backstory="""You're a senior event intelligence analyst with years of experience researching professional and tech conferences.
-            You specialize in using advanced search techniques to uncover detailed information about event audiences, industries, and speaker intent.
-            You know how to dig deeper into event listings, uncovering the business potential behind each gathering.""",
-            tools=[search_tool],
-            verbose=False,
-            llm=llm
-        )
+            return event_id, None
 
-        analyzer = Agent(
-            role="Event Analyzer",
-            goal="Summarize events for sales teams in 2-3 crisp lines",
-            backstory="""You're a B2B content strategist with a sharp ability to condense complex event data into sales-focused summaries.
-            You've worked with sales enablement teams at SaaS companies and know exactly what makes an event valuable for outbound engagement.
-            You help sales teams quickly identify which events are worth pursuing by distilling value propositions clearly.""",
-            verbose=False,
-            llm=llm
-        )
+        # Same series/listing already enriched with this prompt and model: skip search and LLM
+        cache = get_enrichment_cache()
+        cache_key = cache.key("crew", CREW_PROMPT_VERSION, LLM_MODEL, event_fingerprint(data))
+        cached = cache.get(cache_key)
+        if cached:
+            logger.info(f"♻️ Reusing cached summary and score for event {event_id}")
+            metrics.inc("eventmind_enrichments_total", mode="crew", outcome="cached")
+            return event_id, cached
 
-        lead_scorer = Agent(
-            role="Lead Scoring Analyst",
-            goal="Evaluate event potential for sales lead generation",
-            backstory="""You're a growth strategist specializing in B2B SaaS pipeline development. 
-            You've built lead scoring models used by SDR and GTM teams to prioritize outreach opportunities from events. 
-            Your strength is evaluating how well an event aligns with key buyer personas, company ICPs, and intent signals. 
-            You think like a sales leader who only wants to invest time in high-yield events.""",
-            verbose=False,
-            llm=llm
-        )
+        # Reuse this worker's LLM, tools and agents
+        components = get_worker_components()
+        researcher = components['researcher']
+        analyzer = components['analyzer']
+        lead_scorer = components['lead_scorer']
 
         research_task = Task(
             description=(
@@ -171,9 +257,12 @@ def summarize_event(event):
             verbose=False
         )
 
-        time.sleep(1)  # Serper rate limit
+        _throttle('serper')
+        _throttle('llm', CREW_LLM_CALLS)
         logger.info(f"Kicking off CrewAI for event {event_id}")
-        results = crew.kickoff()
+        with metrics.timer("eventmind_llm_seconds", mode="crew"):
+            results = crew.kickoff()
+        record_token_usage("crew", results.token_usage)
 
         # Parse results safely
         try:
@@ -182,7 +271,7 @@ def summarize_event(event):
         except (IndexError, AttributeError) as e:
             logger.error(f"❌ Failed to parse results for {event_id}: {e}")
             #print(f"❌ Failed to parse results for {event_id}: {e}")
-            return event_id, False
+            return event_id, None
 
         data['summary'] = summary_result.strip()
         try:
@@ -199,44 +288,358 @@ def summarize_event(event):
             # print(f"❌ Invalid score format '{score_result}' for {event_id}, skipping")
             data['lead_score'] = None
 
-        # Update database
-        update_event_summary(event_id, data)
-        # print(f"✅ Stored summary and score for {event_id}")
-        logger.info(f"✅ Stored summary and score for event {event_id}")
-        return event_id, True
+        result = {'summary': data['summary'], 'lead_score': data['lead_score']}
+        if result['summary'] and result['lead_score'] is not None:
+            cache.set(cache_key, result, kind="llm")
+        metrics.inc("eventmind_enrichments_total", mode="crew", outcome="ok")
+        logger.info(f"✅ Summarized and scored event {event_id}")
+        return event_id, result
 
     except Exception as e:
         logger.error(f"❌ Failed event {event_id}: {e}")
         # print(f"❌ Failed event {event_id}: {e}")
-        return event_id, False
+        metrics.inc("eventmind_enrichments_total", mode="crew", outcome="failed")
+        return event_id, None
+
+def record_token_usage(mode, usage):
+    """Add an LLM usage object (CrewAI UsageMetrics) to the token and call counters."""
+    if usage is None:
+        return
+    metrics.inc("eventmind_llm_calls_total", getattr(usage, "successful_requests", 0) or 0, mode=mode)
+    metrics.inc("eventmind_llm_tokens_total", getattr(usage, "prompt_tokens", 0) or 0, mode=mode, kind="prompt")
+    metrics.inc("eventmind_llm_tokens_total", getattr(usage, "completion_tokens", 0) or 0, mode=mode, kind="completion")
+
+BATCH_PROMPT = """You help a B2B SaaS sales team targeting tech buyers decide which events to attend.
+For each event below, write a 2-3 line sales-focused summary (theme, audience, why it matters for outreach)
+and rate it from 1 to 10 as a lead generation opportunity.
+
+Events (JSON):
+{events}
+
+Respond with only a JSON array containing one object per event, in any order:
+[{{"id": "<event id>", "summary": "<2-3 lines>", "lead_score": <integer 1-10>}}]"""
+
+def build_batch_prompt(events):
+    """Render the batch prompt for a list of (event_id, data) pairs."""
+    payload = [{
+        "id": event_id,
+        "name": data.get('name', 'Unknown'),
+        "url": data.get('url', ''),
+        "city": data.get('city', 'Unknown'),
+        "is_free": bool(data.get('is_free', 0)),
+        "venue": data.get('venue_name', 'Unknown'),
+        "category": data.get('category_name', 'Unknown')
+    } for event_id, data in events]
+    return BATCH_PROMPT.format(events=json.dumps(payload, indent=1))
+
+def parse_batch_response(raw, expected_ids):
+    """Extract valid {id: {"summary", "lead_score"}} entries from an LLM reply.
+
+    Tolerates code fences and chatter around the JSON array; drops items with
+    unknown IDs, empty summaries or scores outside 1-10.
+    """
+    match = re.search(r"\[.*\]", raw or "", re.DOTALL)
+    if not match:
+        return {}
+    try:
+        items = json.loads(match.group(0))
+    except json.JSONDecodeError:
+        return {}
+    results = {}
+    for item in items if isinstance(items, list) else []:
+        if not isinstance(item, dict):
+            continue
+        event_id = str(item.get("id", ""))
+        summary = item.get("summary")
+        try:
+            score = int(item.get("lead_score"))
+        except (TypeError, ValueError):
+            continue
+        if event_id in expected_ids and isinstance(summary, str) and summary.strip() and 1 <= score <= 10:
+            results[event_id] = {'summary': summary.strip(), 'lead_score': score}
+    return results
+
+def get_batch_llm(batch_len):
+    """Per-worker LLM sized for `batch_len` events, reused across batches."""
+    from dotenv import load_dotenv
+
+    max_tokens = 200 * max(batch_len, EVENTS_PER_CALL) + 100
+    llms = getattr(_worker, 'batch_llms', None)
+    if llms is None:
+        load_dotenv()
+        llms = _worker.batch_llms = {}
+    if max_tokens not in llms:
+        llms[max_tokens] = build_llm(max_tokens=max_tokens)
+    return llms[max_tokens]
 
-def run_summary_for_events():
-    """Run summarization and scoring for all unsummarized events."""
+def summarize_batch(events):
+    """Summarize and score several events with a single LLM call.
+
+    Takes a list of (event_id, url) pairs and returns a list of
+    (event_id, result) like summarize_event. Cached events are answered
+    without calling the LLM; events missing or invalid in the batch reply
+    fall back to the per-event CrewAI chain.
+    """
+    cache = get_enrichment_cache()
+    results = {}
+    batch = []
+    cache_keys = {}
+    for event_id, _ in events:
+        data = fetch_event_data(event_id)
+        if not data:
+            continue
+        cache_keys[event_id] = cache.key("batch", BATCH_PROMPT_VERSION, LLM_MODEL, event_fingerprint(data))
+        cached = cache.get(cache_keys[event_id])
+        if cached:
+            results[event_id] = cached
+            metrics.inc("eventmind_enrichments_total", mode="batch", outcome="cached")
+        else:
+            batch.append((event_id, data))
+    if batch:
+        logger.info(f"🧠 Processing batch of {len(batch)} events in one LLM call")
+        try:
+            _throttle('llm')
+            llm = get_batch_llm(len(batch))
+            before = llm.get_token_usage_summary()
+            with metrics.timer("eventmind_llm_seconds", mode="batch"):
+                raw = llm.call([{"role": "user", "content": build_batch_prompt(batch)}])
+            # The LLM is per worker thread, so the difference is this call's usage
+            record_token_usage("batch", llm.get_token_usage_summary().delta_since(before))
+            fresh = parse_batch_response(raw, {event_id for event_id, _ in batch})
+            metrics.inc("eventmind_enrichments_total", len(fresh), mode="batch", outcome="ok")
+            for event_id, result in fresh.items():
+                cache.set(cache_keys[event_id], result, kind="llm")
+            results.update(fresh)
+        except Exception as e:
+            logger.error(f"❌ Batch LLM call failed: {e}")
+
+    output = []
+    for event_id, event_url in events:
+        if event_id in results:
+            logger.info(f"Assigned lead score {results[event_id]['lead_score']} for event {event_id}")
+            output.append((event_id, results[event_id]))
+        else:
+            logger.info(f"Falling back to per-event chain for {event_id}")
+            output.append(summarize_event((event_id, event_url)))
+    return output
+
+def run_in_worker(work, item):
+    """Pool task: run `work(item)` and hand this worker's metrics back to the parent."""
+    return work(item), metrics.drain()
+
+def provider_limiters(mode, limits=None):
+    """(TokenBucket, tokens per work item) pairs for enrich_async."""
+    limits = limits or build_rate_limits()
+    if mode == "batch":
+        return [(limits['llm'], 1)]
+    return [(limits['serper'], 1), (limits['llm'], CREW_LLM_CALLS)]
+
+async def enrich_async(items, work, max_in_flight=50, limiters=(), on_result=None, thread_pool=None):
+    """Run `work(item)` for every item from one event loop.
+
+    At most `max_in_flight` items run at once, on a thread pool sized to
+    match since CrewAI and Serper clients are blocking. Each item first takes
+    its tokens from every (TokenBucket, tokens) in `limiters`, so per-provider
+    request rates hold no matter how many are in flight. `on_result` is called
+    on the loop thread as each item finishes.
+    Pass a long-lived `thread_pool` when calling this repeatedly: its threads
+    keep their cached CrewAI components (see _worker) between calls.
+    """
+    semaphore = asyncio.Semaphore(max_in_flight)
+    loop = asyncio.get_running_loop()
+    own_pool = thread_pool is None
+    executor = thread_pool or ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="enrich")
+    try:
+        async def run(item):
+            async with semaphore:
+                for bucket, tokens in limiters:
+                    await bucket.acquire_async(tokens)
+                return await loop.run_in_executor(executor, work, item)
+
+        for next_done in asyncio.as_completed([run(item) for item in items]):
+            result = await next_done
+            if on_result:
+                on_result(result)
+    finally:
+        if own_pool:
+            executor.shutdown()
+
+CHECKPOINT_NAME = "summarization"
+
+# Unsummarized events whose heuristic prescore clears the threshold (NULL = not pre-scored yet)
+_PENDING_WHERE = "summary IS NULL AND COALESCE(prescore, 10) >= ? AND id > ?"
+
+def iter_pending_chunks(chunk_size, after_id=None, min_prescore=PRESCORE_THRESHOLD):
+    """Yield lists of (id, url) for unsummarized events in id order, keyset-paginated."""
+    last_id = after_id or ""
+    while True:
+        conn = sqlite3.connect(DB_PATH)
+        try:
+            rows = conn.execute(
+                f"SELECT id, url FROM events WHERE {_PENDING_WHERE} ORDER BY id LIMIT ?",
+                (min_prescore, last_id, chunk_size)
+            ).fetchall()
+        finally:
+            conn.close()
+        if not rows:
+            return
+        yield rows
+        last_id = rows[-1][0]
+
+def count_pending(after_id=None, min_prescore=PRESCORE_THRESHOLD):
+    conn = sqlite3.connect(DB_PATH)
+    try:
+        return conn.execute(f"SELECT COUNT(*) FROM events WHERE {_PENDING_WHERE}",
+                            (min_prescore, after_id or "")).fetchone()[0]
+    finally:
+        conn.close()
+
+def run_summary_for_events(workers=4, batch_size=20, mode="crew", events_per_call=EVENTS_PER_CALL,
+                           executor="process", max_in_flight=50, chunk_size=200, resume=True,
+                           serper_rate_per_min=SERPER_RATE_PER_MIN, llm_rate_per_min=LLM_RATE_PER_MIN,
+                           min_prescore=PRESCORE_THRESHOLD):
+    """Drain the whole backlog of unsummarized events, `chunk_size` rows at a time.
+
+    mode="crew" runs the three-agent chain per event; mode="batch" sends
+    `events_per_call` events per LLM call via summarize_batch.
+    executor="process" uses a Pool of `workers` processes, each throttled to
+    its share of the provider rates; executor="async" drives up to
+    `max_in_flight` enrichments from this process (see enrich_async).
+    Workers only compute results; a BackgroundWriter in this process commits
+    them in batches, so raising `workers` never adds SQLite writers.
+
+    After each chunk is committed the last processed id is checkpointed, so
+    a stopped run (Ctrl-C / SIGTERM finish the current chunk first) resumes
+    where it left off. Events that failed stay pending and are retried by
+    the next full pass once the backlog is drained.
+
+    Events whose heuristic prescore (src/prescore.py) is below
+    `min_prescore` are left unsummarized and never reach the LLM.
+    """
     logger.info("Starting EventMind summarization pipeline...")
-    
-    conn = sqlite3.connect("data/events.db")
-    c = conn.cursor()
-    c.execute("SELECT id, url FROM events WHERE summary IS NULL LIMIT 50")
-    events = c.fetchall()
-    conn.close()
-
-    if not events:
+
+    init_db()
+    backfill_prescores()
+    skipped = count_pending(min_prescore=0) - count_pending(min_prescore=min_prescore)
+    if skipped:
+        logger.info(f"⏭️ Skipping {skipped} events pre-scored below {min_prescore}")
+
+    after_id, processed = load_checkpoint(CHECKPOINT_NAME) if resume else (None, 0)
+    if after_id:
+        logger.info(f"⏩ Resuming after event {after_id} ({processed} events processed previously)")
+    pending = count_pending(after_id, min_prescore)
+    if not pending and after_id:
+        # Everything after the checkpoint is done; start a fresh pass for earlier failures
+        clear_checkpoint(CHECKPOINT_NAME)
+        after_id, processed = None, 0
+        pending = count_pending(min_prescore=min_prescore)
+    if not pending:
         # print("📭 No events to summarize.")
         logger.info("📭 No events to summarize.")
+        clear_checkpoint(CHECKPOINT_NAME)
         return
 
     # print(f"📦 Found {len(events)} events to summarize and score.")
-    logger.info(f"📦 Found {len(events)} events to summarize and score.")
+    logger.info(f"📦 Found {pending} events to summarize and score.")
+
+    stop = threading.Event()
+    def request_stop(signum, frame):
+        logger.info("🛑 Stop requested; finishing the current chunk before exiting...")
+        stop.set()
+    previous_handlers = {sig: signal.signal(sig, request_stop) for sig in (signal.SIGINT, signal.SIGTERM)}
+
+    counts = {'ok': 0, 'failed': 0}
+    start = time.time()
+    pool = loop = thread_pool = None
+    try:
+        with metrics.timer("eventmind_stage_seconds", stage="summarize"), BackgroundWriter(batch_size=batch_size) as writer:
+            def record(output):
+                for event_id, result in (output if mode == "batch" else [output]):
+                    if result:
+                        writer.submit_summary(event_id, result['summary'], result['lead_score'])
+                    counts['ok' if result else 'failed'] += 1
+                    status = "✅ Completed" if result else "❌ Failed"
+                    # print(f"{status} event {event_id}")
+                    logger.info(f"{status} event {event_id}")
+
+            if executor == "async":
+                limiters = provider_limiters(mode, build_rate_limits(serper_rate_per_min, llm_rate_per_min))
+                # One loop and one set of threads for the whole drain, so per-thread CrewAI setup happens once
+                loop = asyncio.new_event_loop()
+                thread_pool = ThreadPoolExecutor(max_workers=max_in_flight, thread_name_prefix="enrich")
+            else:
+                pool = Pool(processes=workers, initializer=init_worker,
+                            initargs=(serper_rate_per_min / workers, llm_rate_per_min / workers))
+
+            for events in iter_pending_chunks(chunk_size, after_id, min_prescore):
+                if mode == "batch":
+                    work = summarize_batch
+                    items = [events[i:i + events_per_call] for i in range(0, len(events), events_per_call)]
+                else:
+                    work, items = summarize_event, events
+
+                if executor == "async":
+                    loop.run_until_complete(enrich_async(items, work, max_in_flight=max_in_flight, limiters=limiters,
+                                                         on_result=record, thread_pool=thread_pool))
+                else:
+                    for output, worker_metrics in pool.imap_unordered(partial(run_in_worker, work), items):
+                        metrics.merge(worker_metrics)
+                        record(output)
 
-    with Pool(processes=4) as pool:
-        results = pool.map(summarize_event, events)
+                writer.sync()
+                processed += len(events)
+                save_checkpoint(CHECKPOINT_NAME, events[-1][0], processed)
+                elapsed = time.time() - start
+                done = counts['ok'] + counts['failed']
+                logger.info(f"📈 {done}/{pending} events this run ({counts['ok']} ok, {counts['failed']} failed), "
+                            f"{done / elapsed * 60:.1f} events/min")
+                if stop.is_set():
+                    logger.info(f"⏸️ Stopped after event {events[-1][0]}; rerun to resume")
+                    break
+            else:
+                clear_checkpoint(CHECKPOINT_NAME)
+        logger.info(f"Storage stats: {writer.stats()}")
+    finally:
+        if pool:
+            pool.close()
+            pool.join()
+        if thread_pool:
+            thread_pool.shutdown()
+        if loop:
+            loop.close()
+        for sig, handler in previous_handlers.items():
+            signal.signal(sig, handler)
 
-    for event_id, success in results:
-        status = "✅ Completed" if success else "❌ Failed"
-        # print(f"{status} event {event_id}")
-        logger.info(f"{status} event {event_id}")
-        
     logger.info("EventMind summarization pipeline completed")
 
 if __name__ == "__main__":
-    run_summary_for_events()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="EventMind: Summarize and score stored events")
+    parser.add_argument("--workers", type=int, default=4, help="Number of summarization worker processes")
+    parser.add_argument("--batch-size", type=int, default=20, help="Results committed per database transaction")
+    parser.add_argument("--mode", choices=["crew", "batch"], default="crew",
+                        help="crew: three-agent chain per event; batch: several events per LLM call")
+    parser.add_argument("--events-per-call", type=int, default=EVENTS_PER_CALL, help="Events per LLM call in batch mode")
+    parser.add_argument("--executor", choices=["process", "async"], default="process",
+                        help="process: multiprocessing Pool; async: one process with many in-flight enrichments")
+    parser.add_argument("--max-in-flight", type=int, default=50, help="Concurrent enrichments with --executor async")
+    parser.add_argument("--no-llm-cache", action="store_true",
+                        help="Ignore cached search results and LLM outputs and always call the providers")
+    parser.add_argument("--chunk-size", type=int, default=200, help="Pending events loaded and checkpointed per chunk")
+    parser.add_argument("--restart", action="store_true", help="Ignore any saved checkpoint and start from the first pending event")
+    parser.add_argument("--serper-rate", type=float, default=SERPER_RATE_PER_MIN, help="Serper requests per minute across all workers")
+    parser.add_argument("--llm-rate", type=float, default=LLM_RATE_PER_MIN, help="LLM requests per minute across all workers")
+    parser.add_argument("--min-prescore", type=int, default=PRESCORE_THRESHOLD,
+                        help="Only enrich events whose heuristic prescore is at least this (0 enriches everything)")
+    parser.add_argument("--metrics-file", help="Write run metrics in Prometheus text format to this file")
+    args = parser.parse_args()
+    if args.no_llm_cache:
+        os.environ["ENRICHMENT_CACHE"] = "0"
+    run_summary_for_events(workers=args.workers, batch_size=args.batch_size,
+                           mode=args.mode, events_per_call=args.events_per_call,
+                           executor=args.executor, max_in_flight=args.max_in_flight,
+                           chunk_size=args.chunk_size, resume=not args.restart,
+                           serper_rate_per_min=args.serper_rate, llm_rate_per_min=args.llm_rate,
+                           min_prescore=args.min_prescore)
+    logger.info(metrics.summary())
+    if args.metrics_file:
+        metrics.write_prometheus(args.metrics_file)
\ No newline at end of file
@@ -0,0 +1,67 @@
+# batch_summary_test.py
+#
+# Runs batch enrichment (sum_agent.summarize_batch) against a local fake LLM
+# endpoint and a throwaway database, so no API keys are needed.
+#
+#   python -m tests.batch_summary_test --events 40 --events-per-call 8
+
+import argparse
+import math
+import os
+import sys
+import tempfile
+import time
+
+from tests.stubs import StubLLMHandler, start_stub_server
+
+
+def seed_events(n):
+    from src.storage.database import EventWriter, init_db
+    init_db()
+    with EventWriter() as writer:
+        for i in range(n):
+            writer.add_event({
+                "id": str(5000 + i),
+                "name": f"Stub Event {i}",
+                "url": f"https://www.eventbrite.com/e/stub-event-{5000 + i}",
+                "start_utc": "2025-06-01T17:00:00Z",
+                "city": "San Francisco",
+                "country": "US",
+                "is_free": i % 2,
+                "venue_name": "Stub Venue",
+                "category_name": "Science & Technology",
+            })
+    return [(str(5000 + i), f"https://www.eventbrite.com/e/stub-event-{5000 + i}") for i in range(n)]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Check batch enrichment against a fake LLM")
+    parser.add_argument("--events", type=int, default=40)
+    parser.add_argument("--events-per-call", type=int, default=8)
+    parser.add_argument("--latency", type=float, default=0.2, help="Fake LLM latency per call in seconds")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(StubLLMHandler, latency=args.latency)
+    os.environ.setdefault("NVIDIA_NIM_API_KEY", "stub")
+    import sum_agent
+    sum_agent.LLM_MODEL = "openai/stub-llm"
+    sum_agent.LLM_BASE_URL = f"{base_url}/v1"
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)  # DB_PATH is relative to the working directory
+        events = seed_events(args.events)
+        start = time.time()
+        results = []
+        for i in range(0, len(events), args.events_per_call):
+            results += sum_agent.summarize_batch(events[i:i + args.events_per_call])
+        elapsed = time.time() - start
+    server.shutdown()
+    calls = server.RequestHandlerClass.calls
+
+    ok = [r for _, r in results if r and 1 <= r["lead_score"] <= 10 and r["summary"]]
+    expected_calls = math.ceil(args.events / args.events_per_call)
+    bad_reply = sum_agent.parse_batch_response('Sure! [{"id": "1", "summary": "", "lead_score": 11}, {"id": "9", "summary": "x", "lead_score": "7"}]', {"1", "2"})
+    passed = len(ok) == args.events and calls == expected_calls and bad_reply == {}
+    print(f"{'✅' if passed else '❌'} {len(ok)}/{args.events} events enriched with "
+          f"{calls} LLM calls (expected {expected_calls}) in {elapsed:.2f}s")
+    sys.exit(0 if passed else 1)
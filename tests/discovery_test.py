@@ -0,0 +1,33 @@
+# discovery_test.py
+#
+# Runs the HTTP discovery parser over saved listing pages, offline.
+#
+#   python -m tests.discovery_test
+
+import os
+import sys
+
+from src.scraper.http_discovery import extract_event_ids
+
+FIXTURES = os.path.join(os.path.dirname(__file__), "fixtures")
+EXPECTED = {
+    "listing_page.html": ["1267735524079", "1290155242059", "1301122334455", "1312233445566"],
+    "listing_page_empty.html": [],
+}
+
+
+def chunked(text, size):
+    return (text[i:i + size] for i in range(0, len(text), size))
+
+
+if __name__ == "__main__":
+    failures = 0
+    for name, expected in EXPECTED.items():
+        with open(os.path.join(FIXTURES, name), encoding="utf-8") as f:
+            html = f.read()
+        whole = extract_event_ids(html)
+        streamed = extract_event_ids(chunked(html, 64))
+        ok = whole == expected and sorted(streamed) == sorted(expected)
+        failures += not ok
+        print(f"{'✅' if ok else '❌'} {name}: {whole} (streamed: {streamed})")
+    sys.exit(1 if failures else 0)
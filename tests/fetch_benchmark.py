@@ -0,0 +1,55 @@
+# fetch_benchmark.py
+#
+# Compares sequential vs concurrent event -> venue fetching, and the API
+# calls each fetch mode (api_client.FETCH_MODES) needs, against a local stub
+# Eventbrite API, so no token or network access is needed.
+#
+#   python -m tests.fetch_benchmark --latency 0.05 --concurrency 16
+
+import argparse
+import random
+import time
+
+from src.scraper import api_client
+from tests.stubs import StubEventbriteHandler, start_stub_server
+
+
+def time_fetch(event_ids, concurrency):
+    api_client._prefetchers = api_client.new_prefetchers()  # every run starts cold
+    start = time.time()
+    fetched = sum(1 for _, event, venue in api_client.fetch_events(event_ids, concurrency=concurrency) if venue)
+    return fetched, time.time() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark concurrent Eventbrite fetching against a stub server")
+    parser.add_argument("--latency", type=float, default=0.05, help="Stub response latency in seconds")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrency for the parallel run")
+    parser.add_argument("--sizes", default="20,100,500", help="Comma-separated event counts")
+    args = parser.parse_args()
+
+    server, base_url = start_stub_server(StubEventbriteHandler, latency=args.latency)
+    api_client.API_BASE = f"{base_url}/v3"
+    api_client.set_cache_enabled(False)  # measure raw fetch concurrency, not venue cache hits
+    api_client.get_client().limiter = None
+    handler = server.RequestHandlerClass
+    default_mode = api_client.FETCH_MODE
+    try:
+        for size in (int(n) for n in args.sizes.split(",")):
+            event_ids = [str(1000 + i) for i in range(size)]
+            random.Random(size).shuffle(event_ids)  # search results interleave organizers
+            _, sequential = time_fetch(event_ids, 1)
+            fetched, parallel = time_fetch(event_ids, args.concurrency)
+            print(f"📊 {size:>4} events: sequential {sequential:.2f}s, "
+                  f"concurrency={args.concurrency} {parallel:.2f}s "
+                  f"({sequential / parallel:.1f}x, {fetched} fetched)")
+            for mode in api_client.FETCH_MODES:
+                api_client.set_fetch_mode(mode)
+                before = getattr(handler, "requests", 0)
+                fetched, elapsed = time_fetch(event_ids, args.concurrency)
+                calls = getattr(handler, "requests", 0) - before
+                print(f"   --fetch-mode {mode:<9} {calls:>5} API calls ({calls / size:.2f}/event), "
+                      f"{elapsed:.2f}s, {fetched} fetched")
+            api_client.set_fetch_mode(default_mode)
+    finally:
+        server.shutdown()
@@ -1,42 +1,348 @@
 # run_benchmark.py
+#
+# Offline, reproducible benchmark of the whole pipeline. Local stand-ins
+# (tests/stubs.py) replace the Eventbrite API, the listing pages, Serper and
+# the LLM, each with a fixed latency and a seeded error rate, so runs are
+# comparable across machines and commits and need no API keys.
+#
+# For every size it measures discovery, fetch, storage and enrichment
+# throughput plus p50/p95 latency, and writes everything to JSON. Enrichment
+# runs through sum_agent.run_summary_for_events once per --executor (process
+# pool vs asyncio), and the report starts with the per-event CrewAI setup cost
+# (components rebuilt per event vs built once per worker):
+#
+#   python -m tests.run_benchmark --sizes 20 100 1000 --output data/benchmark.json
+#   python -m tests.run_benchmark --executor async --max-in-flight 100
+#   python -m tests.run_benchmark --compare data/benchmark.json   # fail on >20% regressions
 
+import argparse
+import json
+import math
+import multiprocessing
+import os
+import platform
+import random
+import resource
+import sys
+import tempfile
 import time
-import sqlite3
 from concurrent.futures import ThreadPoolExecutor, as_completed
-from multiprocessing import Pool
-from CrewAI.Event_Finder_v2.tests.benchmark import summarize_event
 
-DB_PATH = "data/events.db"
+from tests.stubs import (
+    StubEventbriteHandler, StubListingHandler, StubSerperHandler, StubLLMHandler, start_stub_server
+)
 
-def get_events(n=10):
-    conn = sqlite3.connect(DB_PATH, check_same_thread=False)
-    c = conn.cursor()
-    c.execute("SELECT id, url FROM events WHERE summary IS NULL LIMIT ?", (n,))
-    rows = c.fetchall()
+EXECUTORS = ("process", "async")
+STAGES = ("discovery", "fetch", "storage") + tuple(f"enrichment_{executor}" for executor in EXECUTORS)
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile; None for no values."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def stage_result(items, seconds, latencies, errors=0, unit="events"):
+    return {
+        "items": items,
+        "unit": unit,
+        "errors": errors,
+        "seconds": round(seconds, 3),
+        "throughput_per_s": round(items / seconds, 2) if seconds else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1) if latencies else None,
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1) if latencies else None,
+    }
+
+
+def start_services(args):
+    """Start the four stand-ins and point the pipeline at them through its env settings."""
+    servers = {
+        "eventbrite": start_stub_server(StubEventbriteHandler, seed=args.seed,
+                                        latency=args.api_latency, error_rate=args.error_rate),
+        "listing": start_stub_server(StubListingHandler, seed=args.seed + 1, latency=args.listing_latency,
+                                     error_rate=args.error_rate, total=max(args.sizes)),
+        "serper": start_stub_server(StubSerperHandler, seed=args.seed + 2,
+                                    latency=args.serper_latency, error_rate=args.error_rate),
+        "llm": start_stub_server(StubLLMHandler, seed=args.seed + 3,
+                                 latency=args.llm_latency, error_rate=args.error_rate),
+    }
+    # Must be set before src.* and sum_agent are imported: they read these at import time
+    os.environ.update({
+        "EVENTBRITE_API_BASE": f"{servers['eventbrite'][1]}/v3",
+        "EVENTBRITE_TOKEN": "stub",
+        "EVENTBRITE_QUOTA_PER_HOUR": str(10 ** 9),  # measure our code, not the quota bucket
+        "EVENTBRITE_WEB_BASE": servers["listing"][1],
+        "SERPER_BASE_URL": servers["serper"][1],
+        "SERPER_API_KEY": "stub",
+        "LLM_MODEL": "openai/stub-llm",
+        "LLM_BASE_URL": f"{servers['llm'][1]}/v1",
+        "NVIDIA_NIM_API_KEY": "stub",
+        "OPENAI_API_KEY": "stub",
+        "EVENTMIND_CACHE": "0",  # every size starts cold, like a first run
+        "ENRICHMENT_CACHE": "0",
+    })
+    return servers
+
+
+def bench_discovery(n, args):
+    from src.scraper.http_discovery import iter_event_ids_http
+
+    query = {"state": "CA", "city": "San Francisco", "category": "tech", "max_events": n}
+    event_ids, latencies = [], []
+    start = time.perf_counter()
+    pages = iter_event_ids_http(query)
+    while True:
+        page_start = time.perf_counter()
+        try:
+            page_ids = next(pages)
+        except StopIteration:
+            break
+        latencies.append(time.perf_counter() - page_start)
+        event_ids += page_ids
+    elapsed = time.perf_counter() - start
+    return event_ids, stage_result(len(event_ids), elapsed, latencies, errors=n - len(event_ids))
+
+
+def bench_fetch(event_ids, args):
+    from src.scraper.api_client import (
+        get_categories, get_event_with_venue, build_event_record, set_fetch_mode, expect_events
+    )
+
+    set_fetch_mode(args.fetch_mode)
+    expect_events(event_ids)
+    category_map = get_categories()
+
+    def timed(eid):
+        call_start = time.perf_counter()
+        event, venue = get_event_with_venue(eid)
+        return event, venue, time.perf_counter() - call_start
+
+    records, latencies = [], []
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        for future in as_completed([executor.submit(timed, eid) for eid in event_ids]):
+            event, venue, latency = future.result()
+            latencies.append(latency)
+            if event and event.get("id") and venue:
+                records.append(build_event_record(event, venue, category_map))
+    elapsed = time.perf_counter() - start
+    return records, stage_result(len(records), elapsed, latencies, errors=len(event_ids) - len(records))
+
+
+def bench_storage(records, args):
+    from src.storage.database import EventWriter, init_db
+
+    init_db()
+    latencies = []
+    start = time.perf_counter()
+    # One timed commit per batch, as EventWriter does on its own when a batch fills
+    with EventWriter(batch_size=len(records) + 1) as writer:
+        for i in range(0, len(records), args.batch_size):
+            batch_start = time.perf_counter()
+            for record in records[i:i + args.batch_size]:
+                writer.add_event(record)
+            writer.flush()
+            latencies.append(time.perf_counter() - batch_start)
+        stats = writer.stats()
+    elapsed = time.perf_counter() - start
+    result = stage_result(stats["rows_written"], elapsed, latencies, errors=len(records) - stats["rows_written"])
+    result["unit"] = "rows"
+    return [(r["id"], r["url"]) for r in records], result
+
+
+def bench_setup(args):
+    """Per-event CrewAI setup cost: rebuilt for every event vs built once per worker."""
+    import sum_agent
+
+    n = args.setup_events
+    start = time.perf_counter()
+    for _ in range(n):
+        sum_agent.build_components()
+    rebuilt = (time.perf_counter() - start) / n
+
+    start = time.perf_counter()
+    sum_agent.init_worker()
+    for _ in range(n):
+        sum_agent.get_worker_components()
+    per_worker = (time.perf_counter() - start) / n
+
+    print(f"🧱 Setup per event: {rebuilt * 1000:.1f}ms rebuilt each time, "
+          f"{per_worker * 1000:.2f}ms with a per-worker initializer (amortized over {n} events)")
+    return {"events": n, "rebuilt_ms": round(rebuilt * 1000, 2), "per_worker_ms": round(per_worker * 1000, 3)}
+
+
+# Per-item enrichment wall times. While bench_enrichment runs, sum_agent's work
+# function is swapped for one of the timed_* functions below; they are looked up
+# by name when the Pool pickles them, and forked workers inherit the manager
+# list the timings go to.
+_untimed = {}
+_work_seconds = None
+
+
+def _timed(name, item):
+    start = time.perf_counter()
+    try:
+        return _untimed[name](item)
+    finally:
+        _work_seconds.append(time.perf_counter() - start)
+
+
+def timed_summarize_event(event):
+    return _timed("summarize_event", event)
+
+
+def timed_summarize_batch(events):
+    return _timed("summarize_batch", events)
+
+
+def bench_enrichment(events, args, executor):
+    """Drain the stored events with run_summary_for_events on `executor`, starting from no summaries."""
+    global _work_seconds
+    import sum_agent
+    from src.storage.database import connect
+
+    conn = connect()
+    with conn:
+        conn.execute("UPDATE events SET summary = NULL, lead_score = NULL, enriched_at = NULL")
+    name = "summarize_batch" if args.mode == "batch" else "summarize_event"
+    _untimed[name] = getattr(sum_agent, name)
+    setattr(sum_agent, name, timed_summarize_batch if args.mode == "batch" else timed_summarize_event)
+    with multiprocessing.Manager() as manager:
+        _work_seconds = manager.list()
+        try:
+            start = time.perf_counter()
+            sum_agent.run_summary_for_events(workers=args.workers, mode=args.mode,
+                                             events_per_call=args.events_per_call, executor=executor,
+                                             max_in_flight=args.max_in_flight, resume=False,
+                                             serper_rate_per_min=10 ** 9, llm_rate_per_min=10 ** 9, min_prescore=0)
+            elapsed = time.perf_counter() - start
+            latencies = list(_work_seconds)
+        finally:
+            setattr(sum_agent, name, _untimed[name])
+            _work_seconds = None
+    ok = conn.execute("SELECT COUNT(*) FROM events WHERE summary IS NOT NULL").fetchone()[0]
     conn.close()
-    return rows
 
+    result = stage_result(ok, elapsed, latencies, errors=len(events) - ok)
+    result["latency_per"] = f"{args.events_per_call}-event call" if args.mode == "batch" else "event"
+    if executor == "process":
+        # ru_maxrss is the largest single child (KiB on Linux); every worker holds its own interpreter + CrewAI
+        rss_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss * args.workers
+    else:
+        rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    result["peak_rss_mib"] = round(rss_kb / 1024)
+    return result
 
-def benchmark_threads(events, workers=3):
-    print("\n🧵 Starting Thread benchmark...")
-    start = time.time()
-    with ThreadPoolExecutor(max_workers=workers) as executor:
-        futures = [executor.submit(summarize_event, event) for event in events]
-        for f in as_completed(futures):
-            f.result()
-    print(f"✅ Threads finished in {time.time() - start:.2f}s")
 
+def run_size(n, args, servers):
+    """Push `n` events through every stage against a fresh database."""
+    workdir = tempfile.mkdtemp(prefix=f"eventmind-bench-{n}-")
+    os.chdir(workdir)  # DB_PATH and the cache files are relative to the working directory
+    before = {name: getattr(server.RequestHandlerClass, "requests", 0) for name, (server, _) in servers.items()}
+    print(f"\n📏 {n} events")
+    results = {}
+    event_ids, results["discovery"] = bench_discovery(n, args)
+    records, results["fetch"] = bench_fetch(event_ids, args)
+    stored, results["storage"] = bench_storage(records, args)
+    for executor in EXECUTORS:
+        run = not args.skip_enrichment and args.executor in (executor, "both")
+        results[f"enrichment_{executor}"] = bench_enrichment(stored, args, executor) if run else None
+    results["service_requests"] = {
+        name: getattr(server.RequestHandlerClass, "requests", 0) - before[name] for name, (server, _) in servers.items()
+    }
+    for stage in STAGES:
+        r = results[stage]
+        if r:
+            print(f"   {stage:<18} {r['items']:>5} {r['unit']:<6} {r['seconds']:>8.2f}s  "
+                  f"{r['throughput_per_s'] or 0:>9.1f}/s  p50 {r['p50_ms']}ms  p95 {r['p95_ms']}ms  "
+                  f"errors {r['errors']}" + (f"  ~{r['peak_rss_mib']} MiB" if "peak_rss_mib" in r else ""))
+    return results
 
-def benchmark_processes(events, workers=3):
-    print("\n🔀 Starting Multiprocessing benchmark...")
-    start = time.time()
-    with Pool(processes=workers) as pool:
-        pool.map(summarize_event, events)
-    print(f"✅ Processes finished in {time.time() - start:.2f}s")
+
+def compare(report, baseline_path, tolerance):
+    """Print throughput/p95 changes against a previous report; return the regressions."""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    regressions = []
+    print(f"\n🔁 Compared with {baseline_path} ({baseline.get('generated_at')}), tolerance {tolerance:.0%}:")
+    differing = sorted(k for k, v in report["config"].items()
+                       if k not in ("sizes", "tolerance") and baseline.get("config", {}).get(k) != v)
+    if differing:
+        print(f"   ⚠️ Settings differ from the baseline ({', '.join(differing)}); numbers are not like for like")
+    for size, stages in report["results"].items():
+        for stage in STAGES:
+            new, old = stages.get(stage), baseline.get("results", {}).get(size, {}).get(stage)
+            if not new or not old:
+                continue
+            changes = []
+            if old.get("throughput_per_s") and new.get("throughput_per_s"):
+                delta = new["throughput_per_s"] / old["throughput_per_s"] - 1
+                changes.append(f"throughput {delta:+.0%}")
+                if delta < -tolerance:
+                    regressions.append(f"{size} {stage} throughput {delta:+.0%}")
+            if old.get("p95_ms") and new.get("p95_ms"):
+                delta = new["p95_ms"] / old["p95_ms"] - 1
+                changes.append(f"p95 {delta:+.0%}")
+                if delta > tolerance:
+                    regressions.append(f"{size} {stage} p95 {delta:+.0%}")
+            print(f"   {size:>5} {stage:<18} " + ", ".join(changes))
+    return regressions
 
 
 if __name__ == "__main__":
-    events = get_events(n=10)  # Change this to 20, 50, 100 as needed
+    parser = argparse.ArgumentParser(description="Offline EventMind pipeline benchmark against local stand-ins")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[20, 100, 1000], help="Event counts to benchmark")
+    parser.add_argument("--mode", choices=["crew", "batch"], default="crew", help="Enrichment mode (see sum_agent.py)")
+    parser.add_argument("--events-per-call", type=int, default=8, help="Events per LLM call with --mode batch")
+    parser.add_argument("--concurrency", type=int, default=8, help="Fetch threads")
+    parser.add_argument("--fetch-mode", choices=["separate", "expand", "organizer", "venue"], default="expand",
+                        help="Eventbrite fetch mode (see src/scraper/api_client.py)")
+    parser.add_argument("--executor", choices=["process", "async", "both"], default="both",
+                        help="Enrichment executor(s) to run through sum_agent.run_summary_for_events")
+    parser.add_argument("--workers", type=int, default=4, help="Worker processes with --executor process")
+    parser.add_argument("--max-in-flight", type=int, default=50, help="Concurrent enrichments with --executor async")
+    parser.add_argument("--setup-events", type=int, default=10, help="Events to amortize the setup-cost measurement over")
+    parser.add_argument("--batch-size", type=int, default=100, help="Rows per storage commit")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Eventbrite API latency (s)")
+    parser.add_argument("--listing-latency", type=float, default=0.1, help="Listing page latency (s)")
+    parser.add_argument("--serper-latency", type=float, default=0.1, help="Serper latency (s)")
+    parser.add_argument("--llm-latency", type=float, default=0.2, help="LLM latency per call (s)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of stub requests answered with 503")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for injected errors and retry jitter")
+    parser.add_argument("--skip-enrichment", action="store_true", help="Only benchmark discovery, fetch and storage")
+    parser.add_argument("--output", default="data/benchmark_results.json", help="Where to write the JSON report")
+    parser.add_argument("--compare", help="Previous JSON report to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed relative regression with --compare")
+    args = parser.parse_args()
+
+    random.seed(args.seed)
+    output = os.path.abspath(args.output)
+    baseline = os.path.abspath(args.compare) if args.compare else None
+    servers = start_services(args)
+    sys.path.insert(0, os.getcwd())
+
+    report = {
+        "generated_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "config": {k: v for k, v in vars(args).items() if k not in ("output", "compare")},
+        "setup": None if args.skip_enrichment else bench_setup(args),
+        "results": {},
+    }
+    for n in args.sizes:
+        report["results"][str(n)] = run_size(n, args, servers)
+    for server, _ in servers.values():
+        server.shutdown()
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"\n💾 Results written to {output}")
 
-    benchmark_threads(events, workers=3)
-    benchmark_processes(events, workers=3)
+    if baseline:
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print("❌ Regressions: " + "; ".join(regressions))
+            sys.exit(1)
+        print("✅ No regressions beyond tolerance")
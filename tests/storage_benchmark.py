@@ -0,0 +1,76 @@
+# storage_benchmark.py
+#
+# Bulk-load synthetic events into a throwaway database and compare the
+# per-row save_event path with the batched EventWriter.
+#
+#   python -m tests.storage_benchmark --events 10000
+
+import argparse
+import contextlib
+import io
+import os
+import tempfile
+import time
+
+from src.storage import database
+
+
+def synthetic_events(n):
+    for i in range(n):
+        yield {
+            "id": str(10_000_000 + i),
+            "name": f"Synthetic Event {i}",
+            "url": f"https://www.eventbrite.com/e/synthetic-event-{10_000_000 + i}",
+            "start_utc": "2025-06-01T17:00:00Z",
+            "city": ["San Francisco", "Boston", "Austin"][i % 3],
+            "country": "US",
+            "is_free": i % 2,
+            "venue_name": f"Venue {i % 50}",
+            "category_name": "Science & Technology",
+        }
+
+
+def fresh_db(workdir, name):
+    database.DB_PATH = os.path.join(workdir, name)
+    database.init_db()
+
+
+def bench_save_event(n):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        for event in synthetic_events(n):
+            database.save_event(event)
+    return n / (time.perf_counter() - start)
+
+
+def bench_writer(n, batch_size):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        with database.EventWriter(batch_size=batch_size) as writer:
+            for event in synthetic_events(n):
+                writer.add_event(event)
+    elapsed = time.perf_counter() - start
+    return n / elapsed, writer.stats()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark EventMind storage writes")
+    parser.add_argument("--events", type=int, default=10_000, help="Events to load with EventWriter")
+    parser.add_argument("--legacy-events", type=int, default=1_000, help="Events to load with per-row save_event")
+    parser.add_argument("--batch-size", type=int, default=500, help="EventWriter batch size")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as workdir:
+        cwd = os.getcwd()
+        os.chdir(workdir)  # init_db creates ./data
+        try:
+            fresh_db(workdir, "legacy.db")
+            legacy_rate = bench_save_event(args.legacy_events)
+            print(f"🐢 save_event:  {args.legacy_events} events at {legacy_rate:,.0f} rows/sec")
+
+            fresh_db(workdir, "writer.db")
+            writer_rate, stats = bench_writer(args.events, args.batch_size)
+            print(f"🚀 EventWriter: {args.events} events at {writer_rate:,.0f} rows/sec "
+                  f"({writer_rate / legacy_rate:.0f}x); writer stats: {stats}")
+        finally:
+            os.chdir(cwd)
@@ -0,0 +1,279 @@
+# tests/stubs.py
+
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs
+
+
+EVENTS_PER_ORGANIZER = 20
+STUB_CATEGORY = {"id": "102", "name": "Science & Technology"}
+
+
+def make_event(event_id, venue_id):
+    return {
+        "id": event_id,
+        "name": {"text": f"Stub Event {event_id}"},
+        "url": f"https://www.eventbrite.com/e/stub-event-{event_id}",
+        "start": {"utc": "2025-06-01T17:00:00Z"},
+        "is_free": int(event_id) % 3 == 0,
+        "online_event": False,
+        "venue_id": venue_id,
+        "category_id": "102",
+        "organizer_id": str(int(event_id) // EVENTS_PER_ORGANIZER),
+        "changed": "2025-05-01T12:00:00Z",
+    }
+
+
+def make_venue(venue_id):
+    return {
+        "id": venue_id,
+        "name": f"Stub Venue {venue_id}",
+        "address": {"city": "San Francisco", "country": "US"},
+    }
+
+
+class FaultInjectionMixin:
+    """Fixed `latency` per request plus a seeded `error_rate` of 503 replies.
+
+    Set `rng` (e.g. random.Random(seed)) on the handler class to make the
+    failure sequence reproducible; start_stub_server does this by default.
+    """
+
+    latency = 0.05
+    error_rate = 0.0
+    rng = random.Random(0)
+
+    def inject_faults(self) -> bool:
+        """Sleep for the latency; return True (after replying 503) if this request should fail."""
+        time.sleep(self.latency)
+        cls = type(self)
+        cls.requests = getattr(cls, "requests", 0) + 1
+        if self.error_rate and self.rng.random() < self.error_rate:
+            cls.errors = getattr(cls, "errors", 0) + 1
+            self._send({"error": "STUB_UNAVAILABLE"}, status=503)
+            return True
+        return False
+
+
+class StubEventbriteHandler(FaultInjectionMixin, BaseHTTPRequestHandler):
+    """Serves /events/<id>/ (with ?expand=venue,category), /venues/<id>/, /categories/
+    and paged /organizers/<id>/events/ and /venues/<id>/events/ with a fixed latency.
+
+    Organizer N runs events N * EVENTS_PER_ORGANIZER up to the next multiple.
+    Event N is held at venue N % venues + 1; venue listings cover `venue_listing`.
+    """
+
+    latency = 0.05
+    venues = 10
+    list_page_size = 50
+    venue_listing = range(1000, 2000)
+
+    def do_GET(self):
+        if self.inject_faults():
+            return
+        path, _, query = self.path.partition("?")
+        params = {k: v[0] for k, v in parse_qs(query).items()}
+        expand = set(params.get("expand", "").split(","))
+        match = re.match(r"^/v3/events/(\d+)/$", path)
+        if match:
+            return self._send(self._event(match.group(1), expand))
+        match = re.match(r"^/v3/venues/(\d+)/$", path)
+        if match:
+            return self._send(make_venue(match.group(1)))
+        if path == "/v3/categories/":
+            return self._send({"categories": [STUB_CATEGORY]})
+        match = re.match(r"^/v3/organizers/(\d+)/events/$", path)
+        if match:
+            first_id = int(match.group(1)) * EVENTS_PER_ORGANIZER
+            return self._send_page(range(first_id, first_id + EVENTS_PER_ORGANIZER), params, expand)
+        match = re.match(r"^/v3/venues/(\d+)/events/$", path)
+        if match:
+            venue = int(match.group(1))
+            return self._send_page([n for n in self.venue_listing if n % self.venues + 1 == venue], params, expand)
+        self._send({"error": "NOT_FOUND"}, status=404)
+
+    def _send_page(self, event_ids, params, expand):
+        start = int(params.get("continuation", 0))
+        end = min(start + self.list_page_size, len(event_ids))
+        self._send({
+            "events": [self._event(str(event_ids[n]), expand) for n in range(start, end)],
+            "pagination": {"has_more_items": end < len(event_ids),
+                           "continuation": str(end) if end < len(event_ids) else None},
+        })
+
+    def _event(self, event_id, expand):
+        event = make_event(event_id, str(int(event_id) % self.venues + 1))
+        if "venue" in expand:
+            event["venue"] = make_venue(event["venue_id"])
+        if "category" in expand:
+            event["category"] = STUB_CATEGORY
+        return event
+
+    def _send(self, payload, status=200):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubListingHandler(FaultInjectionMixin, BaseHTTPRequestHandler):
+    """Eventbrite search result pages: /d/<state>--<city>/<category>--events/?page=N.
+
+    Each page links `page_size` events until `total` events have been listed;
+    later pages are empty. IDs are derived from the query, so different
+    queries list different events. Point the scraper at it with
+    EVENTBRITE_WEB_BASE=<base_url>.
+    """
+
+    latency = 0.1
+    page_size = 20
+    total = 100
+
+    def do_GET(self):
+        if self.inject_faults():
+            return
+        match = re.match(r"^/d/([^/]+)/([^/]+)--events/\?page=(\d+)", self.path)
+        if not match:
+            return self._send({"error": "NOT_FOUND"}, status=404)
+        base = 10_000_000 + (sum(map(ord, match.group(1) + match.group(2))) % 1000) * 100_000
+        first = (int(match.group(3)) - 1) * self.page_size
+        links = "".join(
+            f'<li><a href="/e/stub-event-{base + n}">Stub Event {base + n}</a></li>'
+            for n in range(first, min(first + self.page_size, self.total))
+        )
+        body = f"<html><body><ul>{links}</ul></body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    _send = StubEventbriteHandler._send
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubSerperHandler(FaultInjectionMixin, BaseHTTPRequestHandler):
+    """google.serper.dev stand-in: POST /search returns a few canned organic results.
+
+    Point sum_agent at it with SERPER_BASE_URL=<base_url>.
+    """
+
+    latency = 0.3
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        query = json.loads(self.rfile.read(length) or b"{}").get("q", "")
+        if self.inject_faults():
+            return
+        self._send({
+            "searchParameters": {"q": query},
+            "organic": [
+                {"title": f"{query} | Stub result {n}", "link": f"https://example.com/{n}",
+                 "snippet": "A conference for CTOs, engineering leaders and enterprise buyers.", "position": n}
+                for n in range(1, 4)
+            ],
+        })
+
+    _send = StubEventbriteHandler._send
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubLLMHandler(FaultInjectionMixin, BaseHTTPRequestHandler):
+    """OpenAI-compatible /v1/chat/completions for batch and CrewAI enrichment.
+
+    Point sum_agent at it with LLM_MODEL=openai/stub-llm and
+    LLM_BASE_URL=<base_url>/v1. Batch prompts get a JSON array in which every
+    event ID found in the prompt has a summary and a deterministic lead
+    score; `drop_every` > 0 omits every Nth event from the reply so per-item
+    fallbacks can be exercised. Agent prompts (the crew chain) get one tool
+    call when tools are offered, then a short plain answer, or a number for
+    the scoring task.
+    """
+
+    latency = 0.2
+    drop_every = 0
+    calls = 0
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        request = json.loads(self.rfile.read(length) or b"{}")
+        if self.inject_faults():
+            return
+        messages = request.get("messages", [])
+        prompt = " ".join(str(m.get("content", "")) for m in messages)
+        type(self).calls += 1
+        if "Events (JSON)" not in prompt:
+            return self._reply(request, prompt, self._agent_message(request, messages, prompt))
+        event_ids = list(dict.fromkeys(re.findall(r'"id": "(\d+)"', prompt)))
+        items = [
+            {"id": eid, "summary": f"Stub summary for event {eid}.", "lead_score": int(eid) % 10 + 1}
+            for n, eid in enumerate(event_ids, 1)
+            if not (self.drop_every and n % self.drop_every == 0)
+        ]
+        content = "```json\n" + json.dumps(items) + "\n```"
+        self._reply(request, prompt, {"role": "assistant", "content": content})
+
+    def _agent_message(self, request, messages, prompt):
+        tools = request.get("tools")
+        if tools and not any(m.get("role") == "tool" for m in messages):
+            url = (re.findall(r"https?://\S+", prompt) or ["event"])[0].rstrip(".")
+            return {"role": "assistant", "content": None, "tool_calls": [{
+                "id": "call_stub", "type": "function",
+                "function": {"name": tools[0]["function"]["name"], "arguments": json.dumps({"search_query": url})},
+            }]}
+        if "Respond only with the number" in prompt:
+            return {"role": "assistant", "content": str(len(prompt) % 10 + 1)}
+        return {"role": "assistant", "content": "A technology conference for CTOs and enterprise buyers; "
+                                                "strong fit for B2B SaaS outreach."}
+
+    def _reply(self, request, prompt, message):
+        content = message.get("content") or ""
+        self._send({
+            "id": "chatcmpl-stub",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stub-llm"),
+            "choices": [{"index": 0, "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+                         "message": message}],
+            "usage": {"prompt_tokens": len(prompt) // 4, "completion_tokens": len(content) // 4,
+                      "total_tokens": (len(prompt) + len(content)) // 4},
+        })
+
+    _send = StubEventbriteHandler._send
+
+    def log_message(self, format, *args):
+        pass
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 256  # avoid SYN retries when benchmarks open many connections at once
+
+
+def start_stub_server(handler_cls, seed=0, **attrs):
+    """Start `handler_cls` on a free localhost port in a daemon thread.
+
+    Keyword arguments override class attributes such as `latency` or
+    `error_rate`; `seed` makes injected failures reproducible.
+    Returns (server, base_url); call server.shutdown() when done.
+    """
+    attrs.setdefault("rng", random.Random(seed))
+    handler = type(handler_cls.__name__, (handler_cls,), attrs)
+    server = StubServer(("127.0.0.1", 0), handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    host, port = server.server_address
+    return server, f"http://{host}:{port}"